@@ -0,0 +1,372 @@
+"""Asynchronous tick ingest service with bounded queues and explicit backpressure.
+
+An ASGI application (no framework needed) that serves the same ingest routes
+as server.py. A handler never writes or trades itself. It validates the
+payload, puts the rows on their partition's bounded queue and answers at
+once, so a slow disk or a busy strategy never holds up a client's request:
+
+    POST /ticks          one bar / tick              -> 202, or 429 when its queue is full
+    POST /ticks/batch    list of bars / ticks        -> 202, or 429 (the whole batch is refused)
+    POST /ticks/raw      raw bid/ask ticks (see bar_aggregator.py)
+    GET  /partitions     partition state, as in server.py
+    GET  /stats          queue depths, drain rates, rejected and dropped counts
+
+Each partition (and each symbol's raw tick aggregator) has its own queue,
+bounded in rows, and one worker task that drains it in order into
+partitions.py. A burst on one symbol only fills that symbol's queue. A worker
+stops draining while its partition's writer / strategy backlog is over
+MAX_BACKLOG rows, so a consumer that lags pushes back all the way to the
+client instead of growing memory.
+
+When a queue is full:
+    reject       (default) answer 429 with a Retry-After estimated from the
+                 queue's recent drain rate; nothing is queued and the client
+                 retries (tickSimulator.py does)
+    drop_oldest  accept the new rows and drop the oldest queued ones,
+                 counted in `dropped`; for feeds where the latest prices
+                 matter more than completeness
+
+Run it with any ASGI server, e.g.
+
+    uvicorn async_server:app --port 5000
+
+The dashboard stream and /predict are still served by server.py.
+"""
+import asyncio
+import atexit
+import json
+import math
+import os
+import time
+from collections import deque
+
+from partitions import STORE_ROOT, Partitions
+from tick_writer import tick_to_row
+
+DATA_ROOT = os.environ.get("TICK_STORE_ROOT", STORE_ROOT)
+AGGREGATE_TIMEFRAMES = os.environ.get("AGGREGATE_TIMEFRAMES", "M1,M5,M15,H1").split(",")
+RUN_STRATEGY = os.environ.get("RUN_STRATEGY") == "1"
+FLUSH_ROWS = int(os.environ.get("TICK_FLUSH_ROWS", 5000))
+FLUSH_INTERVAL = float(os.environ.get("TICK_FLUSH_INTERVAL", 0.5))
+FSYNC_POLICY = os.environ.get("TICK_FSYNC", "never")
+
+# Rows each partition's queue holds before new ticks are refused (or old ones dropped)
+QUEUE_ROWS = int(os.environ.get("INGEST_QUEUE_ROWS", 50_000))
+OVERFLOW_POLICY = os.environ.get("INGEST_OVERFLOW", "reject")
+# Rows a worker hands to its partition at once
+DRAIN_ROWS = int(os.environ.get("INGEST_DRAIN_ROWS", 5000))
+# Writer + strategy backlog of a partition above which its worker waits
+MAX_BACKLOG = int(os.environ.get("INGEST_MAX_BACKLOG", 100_000))
+MAX_BODY_BYTES = int(os.environ.get("INGEST_MAX_BODY_BYTES", 16 * 2**20))
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest")
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"queue full, retry after {retry_after} s")
+        self.retry_after = retry_after
+
+
+class IngestQueue:
+    """Bounded queue of row batches for one consumer, with its accounting.
+
+    The bound is in rows, not requests, so one large batch cannot slip past
+    a limit meant for single ticks.
+    """
+
+    def __init__(self, name, consume, backlog, capacity=QUEUE_ROWS, policy=OVERFLOW_POLICY):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"policy must be one of {OVERFLOW_POLICIES}, got {policy!r}")
+        self.name = name
+        # consume(batch) runs in a worker thread, once per queued batch; backlog() -> rows still pending downstream
+        self.consume = consume
+        self.backlog = backlog
+        self.capacity = capacity
+        self.policy = policy
+        self.batches = deque()
+        self.rows = 0
+        self.in_flight = 0
+        self.ready = asyncio.Event()
+        self.task = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.processed = 0
+        self.max_rows = 0
+        self.waits = 0
+        # Rows per second drained, smoothed; used for Retry-After
+        self.drain_rate = 0.0
+
+    def put(self, batch, count):
+        """Queue `count` rows; raises QueueFull (reject policy) when they do not fit."""
+        if count > self.capacity:
+            raise ValueError(f"batch of {count} rows is larger than the queue ({self.capacity} rows)")
+        if self.rows + count > self.capacity:
+            if self.policy == "reject":
+                self.rejected += count
+                raise QueueFull(self.retry_after(count))
+            while self.rows + count > self.capacity:
+                _, old = self.batches.popleft()
+                self.rows -= old
+                self.dropped += old
+        self.batches.append((batch, count))
+        self.rows += count
+        self.accepted += count
+        self.max_rows = max(self.max_rows, self.rows)
+        self.ready.set()
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._drain())
+
+    def retry_after(self, count):
+        """Seconds until `count` more rows would fit, at the recent drain rate (at least 1)."""
+        excess = self.rows + count - self.capacity
+        if self.drain_rate <= 0:
+            return 1
+        return max(1, math.ceil(excess / self.drain_rate))
+
+    async def _drain(self):
+        while True:
+            await self.ready.wait()
+            if not self.batches:
+                self.ready.clear()
+                continue
+            # A consumer that lags downstream is not fed more; the queue fills and clients get 429
+            if self.backlog() > MAX_BACKLOG:
+                self.waits += 1
+                await asyncio.sleep(0.05)
+                continue
+            batches, rows = [], 0
+            while self.batches and rows < DRAIN_ROWS:
+                batch, count = self.batches.popleft()
+                batches.append((batch, count))
+                rows += count
+            self.rows -= rows
+            self.in_flight = rows
+            start = time.perf_counter()
+            try:
+                lost = await asyncio.to_thread(self._consume_each, batches)
+            finally:
+                self.in_flight = 0
+            self.dropped += lost
+            self.processed += rows - lost
+            rate = rows / max(time.perf_counter() - start, 1e-6)
+            self.drain_rate = rate if self.drain_rate == 0 else 0.8 * self.drain_rate + 0.2 * rate
+
+    def _consume_each(self, batches):
+        """Hand the batches on one by one, so a failing batch loses only its own rows; returns the rows lost."""
+        lost = 0
+        for batch, count in batches:
+            try:
+                self.consume(batch)
+            except Exception as e:
+                # Keep the worker alive; the handlers validate everything, so this is a bug or a broken consumer
+                lost += count
+                print(f"Ingest of {count} rows into {self.name} failed: {e}")
+        return lost
+
+    async def join(self):
+        """Wait until everything queued has been handed on."""
+        while self.rows or self.in_flight:
+            await asyncio.sleep(0.01)
+
+    def stats(self):
+        return {"queue": self.name, "rows": self.rows, "capacity": self.capacity, "max_rows": self.max_rows,
+                "accepted": self.accepted, "rejected": self.rejected, "dropped": self.dropped,
+                "processed": self.processed, "backlog": self.backlog(), "backlog_waits": self.waits,
+                "drain_rate": round(self.drain_rate, 1)}
+
+
+class IngestApp:
+    """The ASGI application; `partitions` are fed only by the queue workers."""
+
+    def __init__(self, partitions, capacity=QUEUE_ROWS, policy=OVERFLOW_POLICY):
+        self.partitions = partitions
+        self.capacity = capacity
+        self.policy = policy
+        self.queues = {}
+        self.raw_queues = {}
+        self.routes = {
+            ("POST", "/ticks"): self.receive_tick,
+            ("POST", "/ticks/batch"): self.receive_tick_batch,
+            ("POST", "/ticks/raw"): self.receive_raw_ticks,
+            ("GET", "/partitions"): self.partition_status,
+            ("GET", "/stats"): self.stats,
+        }
+
+    # ------------------------------------------------------------------ queues
+
+    def partition_queue(self, key):
+        queue = self.queues.get(key)
+        if queue is None:
+            partition = self.partitions.get(*key)
+            queue = self.queues[key] = IngestQueue(partition.name, partition.ingest, partition.backlog,
+                                                   self.capacity, self.policy)
+        return queue
+
+    def raw_queue(self, symbol):
+        queue = self.raw_queues.get(symbol)
+        if queue is None:
+            def consume(batch):
+                self.partitions.aggregate(symbol, *batch)
+
+            def backlog():
+                found = (self.partitions.find(symbol, timeframe) for timeframe in self.partitions.aggregate_timeframes)
+                return max((partition.backlog() for partition in found if partition is not None), default=0)
+            queue = self.raw_queues[symbol] = IngestQueue(f"{symbol} raw", consume, backlog,
+                                                          self.capacity, self.policy)
+        return queue
+
+    def enqueue(self, get_queue, groups):
+        """Queue {key: (batch, rows)} into get_queue(key) all or nothing; returns the row count.
+
+        Raises ValueError (413) when a batch could never fit, before any queue
+        (or partition) is created, and QueueFull (429, reject policy) when a
+        batch refused by one queue must be refused by all.
+        """
+        for _, count in groups.values():
+            if count > self.capacity:
+                raise ValueError(f"batch of {count} rows is larger than the queue ({self.capacity} rows)")
+        items = [(get_queue(key), batch, count) for key, (batch, count) in groups.items()]
+        if self.policy == "reject":
+            if any(queue.rows + count > queue.capacity for queue, _, count in items):
+                for queue, _, count in items:
+                    queue.rejected += count
+                raise QueueFull(max(queue.retry_after(count) for queue, _, count in items))
+        for queue, batch, count in items:
+            queue.put(batch, count)
+        return sum(count for _, _, count in items)
+
+    async def drain(self):
+        for queue in list(self.queues.values()) + list(self.raw_queues.values()):
+            await queue.join()
+
+    # ------------------------------------------------------------------ routes
+
+    async def receive_tick(self, payload):
+        if not isinstance(payload, dict):
+            return 400, {"error": "Expected a JSON object"}
+        return self._queue_ticks([payload])
+
+    async def receive_tick_batch(self, payload):
+        # Accept either a bare list of ticks or {"ticks": [...]}
+        ticks = payload.get("ticks") if isinstance(payload, dict) else payload
+        if not isinstance(ticks, list):
+            return 400, {"error": "Expected a JSON array of ticks"}
+        return self._queue_ticks(ticks)
+
+    def _queue_ticks(self, ticks):
+        try:
+            groups = self.partitions.group(ticks, tick_to_row)
+        except KeyError as e:
+            return 400, {"error": f"Missing field {e}"}
+        except (TypeError, AttributeError, ValueError, OverflowError) as e:
+            return 400, {"error": f"Invalid tick: {e}"}
+        try:
+            count = self.enqueue(self.partition_queue, {key: (rows, len(rows)) for key, rows in groups.items()})
+        except ValueError as e:
+            return 413, {"error": str(e)}
+        return 202, {"message": "Ticks queued", "count": count}
+
+    async def receive_raw_ticks(self, payload):
+        ticks = payload.get("ticks", [payload]) if isinstance(payload, dict) else payload
+        if not isinstance(ticks, list):
+            return 400, {"error": "Expected a JSON tick or array of ticks"}
+        try:
+            groups = self.partitions.group_raw(ticks)
+        except KeyError as e:
+            return 400, {"error": f"Missing field {e}"}
+        except (TypeError, AttributeError, ValueError, OverflowError) as e:
+            return 400, {"error": f"Invalid tick: {e}"}
+        try:
+            count = self.enqueue(self.raw_queue, {symbol: (columns, len(columns[0])) for symbol, columns in groups.items()})
+        except ValueError as e:
+            return 413, {"error": str(e)}
+        return 202, {"message": "Ticks queued", "count": count}
+
+    async def partition_status(self, payload):
+        return 200, {"partitions": [partition.status() for partition in self.partitions],
+                     "aggregators": self.partitions.aggregator_status()}
+
+    async def stats(self, payload):
+        queues = [queue.stats() for queue in list(self.queues.values()) + list(self.raw_queues.values())]
+        totals = {name: sum(q[name] for q in queues) for name in ("rows", "accepted", "rejected", "dropped",
+                                                                  "processed")}
+        return 200, {"totals": totals, "queues": queues}
+
+    # ------------------------------------------------------------------ ASGI
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            methods = [method for method, path in self.routes if path == scope["path"]]
+            status, body = (405, {"error": "Method not allowed"}) if methods else (404, {"error": "Not found"})
+            await self._respond(send, status, body)
+            return
+
+        payload = None
+        if scope["method"] == "POST":
+            body = await self._read_body(receive)
+            if body is None:
+                await self._respond(send, 413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+        try:
+            status, body = await handler(payload)
+        except QueueFull as e:
+            await self._respond(send, 429, {"error": "Ingest queue full, retry later", "retry_after": e.retry_after},
+                                [(b"retry-after", str(e.retry_after).encode())])
+            return
+        await self._respond(send, status, body)
+
+    async def _read_body(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return b""
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _respond(send, status, body, headers=()):
+        data = json.dumps(body, default=str).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(data)).encode()), *headers]})
+        await send({"type": "http.response.body", "body": data})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Hand on everything already accepted, then flush and close the stores
+                await self.drain()
+                await asyncio.to_thread(self.partitions.close)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+partitions = Partitions(DATA_ROOT, aggregate_timeframes=AGGREGATE_TIMEFRAMES, run_strategy=RUN_STRATEGY,
+                        writer_options={"flush_rows": FLUSH_ROWS, "flush_interval": FLUSH_INTERVAL,
+                                        "fsync": FSYNC_POLICY})
+# Servers without lifespan support never send shutdown; closing twice is harmless
+atexit.register(partitions.close)
+app = IngestApp(partitions)
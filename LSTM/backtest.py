@@ -0,0 +1,267 @@
+"""Vectorized backtest of the SMA/EMA crossover strategy with pyramiding.
+
+Implements the same rules as trading_engine.TradingEngine (and the original
+live_trade.py) over a full price history:
+
+  * open a long position with `initial_lot_size` on a buy crossover when flat,
+  * close everything on the next sell crossover,
+  * add `lot_multiplier` x the current lot size every time the close is
+    `pips_gain_for_increase` above the last entry price, then move the entry
+    price to that close.
+
+Signals and equity are computed with array operations; the only Python loop
+runs once per order (not per bar), using searchsorted / flatnonzero to jump
+from one event to the next.
+
+    python backtest.py data/EURUSD_M15.csv --verify 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import talib
+
+from market_data import load_columns
+from trading_engine import StrategyConfig, TradingEngine
+
+# Units of the base currency per lot
+CONTRACT_SIZE = 100000
+
+# Order actions, as stored in BacktestResult.orders["action"]
+OPEN, ADD, CLOSE = "open", "add", "close"
+
+
+class BacktestResult:
+    """Orders, per-position trades, equity curve and summary statistics."""
+
+    def __init__(self, orders, trades, equity, stats):
+        self.orders = orders
+        self.trades = trades
+        self.equity = equity
+        self.stats = stats
+
+
+def crossover_signals(close, sma_period=50, ema_period=10):
+    """Buy/sell crossover flags of EMA over SMA, as used by the live strategy."""
+    close = np.asarray(close, dtype=float)
+    distance = -(talib.SMA(close, timeperiod=sma_period) - talib.EMA(close, timeperiod=ema_period))
+    previous = np.empty_like(distance)
+    previous[0] = np.nan
+    previous[1:] = distance[:-1]
+    with np.errstate(invalid="ignore"):
+        buy = (previous < 0) & (distance > 0)
+        sell = (previous > 0) & (distance < 0)
+    return buy, sell
+
+
+def simulate(close, buy, sell, config):
+    """Walk from signal to signal and return the orders as parallel arrays.
+
+    Returns (bars, actions, lots, prices, position_ids).
+    """
+    if config.pips_gain_for_increase <= 0:
+        raise ValueError("pips_gain_for_increase must be positive")
+    close = np.asarray(close, dtype=float)
+    buy_bars = np.flatnonzero(buy)
+    sell_bars = np.flatnonzero(sell)
+    n = len(close)
+
+    bars, actions, lots, prices, position_ids = [], [], [], [], []
+
+    def order(bar, action, lot, position):
+        bars.append(bar)
+        actions.append(action)
+        lots.append(lot)
+        prices.append(close[bar])
+        position_ids.append(position)
+
+    position = 0
+    next_free_bar = 0
+    while True:
+        i = np.searchsorted(buy_bars, next_free_bar)
+        if i == len(buy_bars):
+            break
+        entry = buy_bars[i]
+        j = np.searchsorted(sell_bars, entry, side="right")
+        exit_bar = sell_bars[j] if j < len(sell_bars) else None
+        end = exit_bar if exit_bar is not None else n
+
+        order(entry, OPEN, config.initial_lot_size, position)
+        current_lot = config.initial_lot_size
+        total_lot = config.initial_lot_size
+        anchor_bar = entry
+        # Pyramid: jump to each bar where the close clears the last entry by the threshold
+        while anchor_bar + 1 < end:
+            segment = close[anchor_bar + 1:end]
+            hits = np.flatnonzero((segment - close[anchor_bar]) * config.pip_factor >= config.pips_gain_for_increase)
+            if len(hits) == 0:
+                break
+            anchor_bar = anchor_bar + 1 + hits[0]
+            new_lot = current_lot * config.lot_multiplier
+            order(anchor_bar, ADD, new_lot, position)
+            current_lot += new_lot
+            total_lot += new_lot
+
+        if exit_bar is None:
+            break
+        order(exit_bar, CLOSE, total_lot, position)
+        position += 1
+        next_free_bar = exit_bar + 1
+
+    return (np.array(bars, dtype=np.int64), np.array(actions, dtype=object), np.array(lots, dtype=float),
+            np.array(prices, dtype=float), np.array(position_ids, dtype=np.int64))
+
+
+def equity_curve(close, bars, actions, lots, prices, contract_size=CONTRACT_SIZE):
+    """Mark-to-market equity per bar (realized + open P/L) from the order arrays."""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    is_close = actions == CLOSE
+    entries = ~is_close
+
+    # Open size and cost basis change at every entry and drop to zero at every close
+    d_size = np.zeros(n)
+    d_cost = np.zeros(n)
+    d_realized = np.zeros(n)
+    np.add.at(d_size, bars[entries], lots[entries])
+    np.add.at(d_cost, bars[entries], lots[entries] * prices[entries])
+
+    if is_close.any():
+        # Size and cost held just before each close
+        size = np.cumsum(d_size)
+        cost = np.cumsum(d_cost)
+        close_bars = bars[is_close]
+        held_size = size[close_bars] - np.concatenate(([0.0], size[close_bars][:-1]))
+        held_cost = cost[close_bars] - np.concatenate(([0.0], cost[close_bars][:-1]))
+        # Positions never overlap, so cumulative size at a close minus size at the previous
+        # close is exactly what the closing order flattens
+        np.add.at(d_size, close_bars, -held_size)
+        np.add.at(d_cost, close_bars, -held_cost)
+        np.add.at(d_realized, close_bars, held_size * close[close_bars] - held_cost)
+
+    open_pnl = np.cumsum(d_size) * close - np.cumsum(d_cost)
+    return (np.cumsum(d_realized) + open_pnl) * contract_size
+
+
+def trade_table(bars, actions, lots, prices, position_ids, times, close, contract_size=CONTRACT_SIZE):
+    """One row per position: entry/exit, number of add-ons, lots and P/L."""
+    if len(bars) == 0:
+        return pd.DataFrame(columns=["entry_time", "exit_time", "entry_price", "exit_price",
+                                     "add_ons", "total_lot", "pnl", "open"])
+    orders = pd.DataFrame({"position": position_ids, "bar": bars, "action": actions, "lot": lots, "price": prices})
+    entries = orders[orders["action"] != CLOSE]
+    exits = orders[orders["action"] == CLOSE].set_index("position")
+
+    grouped = entries.groupby("position")
+    trades = pd.DataFrame({
+        "entry_bar": grouped["bar"].first(),
+        "entry_price": grouped["price"].first(),
+        "add_ons": grouped["bar"].count() - 1,
+        "total_lot": grouped["lot"].sum(),
+        "cost": (entries["lot"] * entries["price"]).groupby(entries["position"]).sum(),
+    })
+    trades["open"] = ~trades.index.isin(exits.index)
+    # Open positions are marked to the last close
+    exit_bar = exits["bar"].reindex(trades.index).fillna(len(close) - 1).astype(np.int64)
+    trades["exit_bar"] = exit_bar
+    trades["exit_price"] = close[exit_bar.values]
+    trades["pnl"] = (trades["total_lot"] * trades["exit_price"] - trades["cost"]) * contract_size
+    trades["entry_time"] = times[trades["entry_bar"].values]
+    trades["exit_time"] = times[trades["exit_bar"].values]
+    return trades[["entry_time", "exit_time", "entry_price", "exit_price", "add_ons", "total_lot", "pnl", "open"]]
+
+
+def summarize(trades, equity):
+    """Headline statistics for a backtest."""
+    closed = trades[~trades["open"]]
+    pnl = closed["pnl"]
+    gross_win = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl <= 0].sum()
+    drawdown = np.maximum.accumulate(equity) - equity if len(equity) else np.zeros(1)
+    return {
+        "trades": len(closed),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "net_profit": float(pnl.sum()),
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else float("inf"),
+        "avg_trade": float(pnl.mean()) if len(pnl) else 0.0,
+        "max_drawdown": float(drawdown.max()),
+        "final_equity": float(equity[-1]) if len(equity) else 0.0,
+        "max_add_ons": int(trades["add_ons"].max()) if len(trades) else 0,
+    }
+
+
+def run_backtest(times, close, config=None, contract_size=CONTRACT_SIZE):
+    """Backtest the strategy over full arrays of bar times and closes."""
+    config = config or StrategyConfig()
+    times = np.asarray(times)
+    close = np.asarray(close, dtype=float)
+    buy, sell = crossover_signals(close, config.sma_period, config.ema_period)
+    bars, actions, lots, prices, position_ids = simulate(close, buy, sell, config)
+
+    orders = pd.DataFrame({"time": times[bars], "bar": bars, "action": actions, "lot": lots,
+                           "price": prices, "position": position_ids})
+    trades = trade_table(bars, actions, lots, prices, position_ids, times, close, contract_size)
+    equity = equity_curve(close, bars, actions, lots, prices, contract_size)
+    return BacktestResult(orders, trades, pd.Series(equity, index=times, name="equity"), summarize(trades, equity))
+
+
+def compare_with_engine(times, close, config=None):
+    """Replay bars through TradingEngine and check it places the same orders.
+
+    Returns the number of orders compared; raises AssertionError on the first mismatch.
+    """
+    config = config or StrategyConfig()
+    result = run_backtest(times, close, config)
+    engine = TradingEngine(config, broker=None, window=1)
+    engine.orders = []
+    for dt, c in zip(times, np.asarray(close, dtype=float).tolist()):
+        engine.on_bar(dt, c)
+
+    live = [(o["bar"], o["action"], o["lot"], o["price"]) for o in engine.orders]
+    vectorized = list(zip(result.orders["bar"].tolist(), result.orders["action"].tolist(),
+                          result.orders["lot"].tolist(), result.orders["price"].tolist()))
+    for k, (a, b) in enumerate(zip(live, vectorized)):
+        if a[:2] != b[:2] or not np.isclose(a[2], b[2]) or a[3] != b[3]:
+            raise AssertionError(f"order {k} differs: engine {a} vs backtest {b}")
+    if len(live) != len(vectorized):
+        raise AssertionError(f"engine placed {len(live)} orders, backtest {len(vectorized)}")
+    return len(live)
+
+
+def load_bars(csv_file):
+    """Load an MT5 export (Date, Time, OHLC, volume) into time and close arrays."""
+    bars = load_columns(csv_file)
+    return np.asarray(bars["Datetime"]), np.asarray(bars["Close"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the SMA/EMA pyramiding strategy.")
+    parser.add_argument("csv", nargs="?", default="data/EURUSD_M15.csv")
+    parser.add_argument("--lot", type=float, default=0.01, help="initial lot size")
+    parser.add_argument("--multiplier", type=float, default=2, help="add-on lot multiplier")
+    parser.add_argument("--pips", type=float, default=100, help="pips gained before adding to the position")
+    parser.add_argument("--sma", type=int, default=50)
+    parser.add_argument("--ema", type=int, default=10)
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="also replay the first N bars through TradingEngine and compare orders")
+    parser.add_argument("--trades", default=None, help="write the trade table to this CSV")
+    args = parser.parse_args()
+
+    config = StrategyConfig(initial_lot_size=args.lot, lot_multiplier=args.multiplier,
+                            pips_gain_for_increase=args.pips, sma_period=args.sma, ema_period=args.ema)
+    times, close = load_bars(args.csv)
+
+    start = time.perf_counter()
+    result = run_backtest(times, close, config)
+    elapsed = time.perf_counter() - start
+
+    print(f"Backtested {len(close)} bars in {elapsed * 1000:.1f} ms")
+    for key, value in result.stats.items():
+        print(f"  {key:14s} {value:,.2f}" if isinstance(value, float) else f"  {key:14s} {value}")
+    if args.trades:
+        result.trades.to_csv(args.trades, index=False)
+
+    if args.verify:
+        count = compare_with_engine(times[:args.verify], close[:args.verify], config)
+        print(f"TradingEngine matches the backtest on the first {args.verify} bars ({count} orders)")
@@ -0,0 +1,232 @@
+"""Push live bars, indicators, signals and orders to browsers over Server-Sent Events.
+
+EventHub fans events out to any number of subscribers. Each event is
+serialized once, whatever the number of viewers, and every subscriber has a
+bounded queue. A viewer that falls too far behind is disconnected rather than
+allowed to hold memory or slow the server down; its browser reconnects on its
+own and starts again from a snapshot.
+
+DashboardFeed turns the server's ticks (or the trading engine's bars and
+orders) into the dashboard's events:
+
+    snapshot  on connect: the last SNAPSHOT_BARS bars, recent orders and the position
+    bars      new bars since the previous event, with indicator values and signals
+    order     an order sent by the trading engine, with the resulting position
+
+A new subscriber registers and receives its snapshot under the same lock as
+publishing, so it never misses an event nor sees one twice. Bars are
+coalesced and published every `interval` seconds, so a batch of ticks becomes
+one event instead of one per tick.
+
+server.py serves the stream at /stream and the browser chart at /dashboard.
+"""
+import json
+import math
+import queue
+import threading
+from collections import deque
+
+from streaming_indicators import LiveIndicators
+
+SNAPSHOT_BARS = 500
+SNAPSHOT_ORDERS = 100
+SUBSCRIBER_QUEUE = 1000
+KEEPALIVE_SECONDS = 15.0
+
+# Bar fields, in the order of each bar array sent to the browser
+BAR_FIELDS = ["bar", "time", "close", "sma_10", "sma_50", "ema_10", "macd", "macd_signal", "macd_hist",
+              "distance", "signal"]
+
+
+def _json(value):
+    # NaN (indicators warming up) is not valid JSON; browsers get null
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def sse_message(event, data, event_id=None):
+    """One SSE frame; `data` is already-serialized JSON."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One viewer's queue of SSE frames; `closed` is set when it was dropped for lagging."""
+
+    def __init__(self, hub, size):
+        self.hub = hub
+        self.queue = queue.Queue(size)
+        self.closed = False
+
+    def frames(self, keepalive=KEEPALIVE_SECONDS):
+        """SSE frames until the subscription is dropped; comments keep idle connections open."""
+        try:
+            while not self.closed:
+                try:
+                    frame = self.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """Publish events to every subscriber, keeping the state a late joiner's snapshot is built from."""
+
+    def __init__(self, snapshot, queue_size=SUBSCRIBER_QUEUE):
+        # snapshot() -> dict, called under the hub lock when a viewer subscribes
+        self._snapshot = snapshot
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        subscription = Subscription(self, self.queue_size)
+        with self.lock:
+            snapshot = json.dumps(self._snapshot(), default=str)
+            subscription.queue.put_nowait(sse_message("snapshot", snapshot, self.last_id))
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def publish(self, event, payload, update=None):
+        """Send `payload` to every subscriber; `update()` (state change for snapshots) runs under the same lock."""
+        data = json.dumps(payload, default=str)
+        with self.lock:
+            if update is not None:
+                update()
+            self.last_id += 1
+            frame = sse_message(event, data, self.last_id)
+            for subscription in list(self.subscribers):
+                try:
+                    subscription.queue.put_nowait(frame)
+                except queue.Full:
+                    # Too far behind: drop it; the browser reconnects and resyncs from a snapshot
+                    subscription.closed = True
+                    self.subscribers.discard(subscription)
+                    self.dropped += 1
+            self.published += 1
+
+    def close(self):
+        with self.lock:
+            for subscription in self.subscribers:
+                subscription.closed = True
+                try:
+                    subscription.queue.put_nowait(None)
+                except queue.Full:
+                    pass
+            self.subscribers.clear()
+
+
+class DashboardFeed:
+    """Indicator bars, signals, orders and position state for the dashboard, published through an EventHub.
+
+    Without a trading engine the feed runs its own LiveIndicators over the
+    received ticks (`on_tick`); with one, attach() hooks into the engine's bar
+    listeners and broker so the dashboard shows exactly what the engine saw.
+    """
+
+    def __init__(self, interval=0.1, snapshot_bars=SNAPSHOT_BARS):
+        self.interval = interval
+        # The feed keeps its own bar history; the indicators only need their running state
+        self.indicators = LiveIndicators(window=1)
+        self.bars = deque(maxlen=snapshot_bars)
+        self.orders = deque(maxlen=SNAPSHOT_ORDERS)
+        self.position = {"open": False, "side": None, "lot": 0, "entry_price": None}
+        self.hub = EventHub(self._snapshot)
+        self._prev_distance = float("nan")
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dashboard-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._flush()
+        self.hub.close()
+
+    def attach(self, engine):
+        """Follow a TradingEngine's bars and orders instead of computing indicators here."""
+        engine.listeners.append(self.on_bar)
+        broker = engine.broker
+
+        def publish_order(order):
+            if broker is not None:
+                broker(order)
+            self.on_order(order)
+        engine.broker = publish_order
+        return self
+
+    # ------------------------------------------------------------------ inputs
+
+    def on_tick(self, dt, close):
+        """Update the feed's own indicators with one tick (when no engine is attached)."""
+        with self._pending_lock:
+            row = self.indicators.update(dt, close)
+            distance = row[-1]
+            buy_signal = self._prev_distance < 0 and distance > 0
+            sell_signal = self._prev_distance > 0 and distance < 0
+            self._prev_distance = distance
+            self._pending.append(self._bar(self.indicators.bars - 1, row, buy_signal, sell_signal))
+
+    def on_bar(self, bar, row, buy_signal, sell_signal):
+        """TradingEngine listener."""
+        with self._pending_lock:
+            self._pending.append(self._bar(bar, row, buy_signal, sell_signal))
+
+    def on_order(self, order):
+        order = {key: _json(value) for key, value in order.items()}
+        position = self._position_after(order)
+
+        def update():
+            self.orders.append(order)
+            self.position = position
+        self._flush()  # bars before the order go out first
+        self.hub.publish("order", {"order": order, "position": position}, update)
+
+    # ------------------------------------------------------------------ outputs
+
+    @staticmethod
+    def _bar(bar, row, buy_signal, sell_signal):
+        signal = "buy" if buy_signal else "sell" if sell_signal else None
+        return [bar, *(_json(value) for value in row), signal]
+
+    @staticmethod
+    def _position_after(order):
+        if order["action"] == "close":
+            return {"open": False, "side": None, "lot": 0, "entry_price": None}
+        return {"open": True, "side": order["side"], "lot": order["total_lot"], "entry_price": order["price"]}
+
+    def _snapshot(self):
+        return {"fields": BAR_FIELDS, "bars": list(self.bars), "orders": list(self.orders),
+                "position": self.position}
+
+    def _flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self.hub.publish("bars", {"bars": pending}, lambda: self.bars.extend(pending))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush()
@@ -0,0 +1,175 @@
+"""Long-lived forecaster for the LSTM trend model.
+
+The model is loaded once and the whole autoregressive rollout (predict the
+next close, append it to the window, predict again) runs inside one compiled
+tf.function call instead of one `model.predict` per step. Windows for many
+instruments can be stacked and forecast in a single batched call.
+
+Windows are in the model's scaled feature space, shaped
+(batch, seq_length, n_features) with the close in column 0. During the rollout
+the other features (e.g. tick volume) carry their last known value forward,
+as predict_and_plot.py did. When the service is built from a model bundle
+(see model_bundle.py), `forecast` also takes raw feature rows and returns
+prices, using the scalers saved at training time.
+
+    python forecast_service.py --batch 32 --steps 20
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from model_bundle import BUNDLE_PATH, load_bundle
+
+MODEL_PATH = BUNDLE_PATH
+
+
+class ForecastService:
+    """Load the model once and serve batched multi-step forecasts.
+
+    `model_path` is a bundle directory or a bare Keras model file; only a
+    bundle carries the scalers needed by `forecast`. A missing path raises
+    FileNotFoundError saying how to create the bundle.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, steps=20, jit_compile=False, model=None):
+        self.bundle = None
+        if model is None:
+            if os.path.isdir(model_path) or not os.path.exists(model_path):
+                self.bundle = load_bundle(model_path)
+                model = self.bundle.model
+            else:
+                model = load_model(model_path, compile=False)
+        self.model = model
+        _, self.seq_length, self.n_features = self.model.input_shape
+        self.default_steps = steps
+        self.jit_compile = jit_compile
+        self._rollouts = {}
+        # Trace and warm up the default rollout now rather than on the first request
+        self.forecast_scaled(np.zeros((1, self.seq_length, self.n_features), dtype=np.float32), steps)
+
+    def _rollout(self, steps):
+        if steps not in self._rollouts:
+            model = self.model
+            spec = tf.TensorSpec((None, self.seq_length, self.n_features), tf.float32)
+
+            @tf.function(input_signature=[spec], jit_compile=self.jit_compile)
+            def rollout(windows):
+                predictions = []
+                for _ in range(steps):
+                    next_close = model(windows, training=False)  # (batch, 1)
+                    next_row = tf.concat([next_close, windows[:, -1, 1:]], axis=1)
+                    windows = tf.concat([windows[:, 1:, :], next_row[:, tf.newaxis, :]], axis=1)
+                    predictions.append(next_close[:, 0])
+                return tf.stack(predictions, axis=1)  # (batch, steps)
+
+            self._rollouts[steps] = rollout
+        return self._rollouts[steps]
+
+    def forecast_scaled(self, windows, steps=None):
+        """Forecast `steps` scaled closes for every window; returns (batch, steps)."""
+        windows = np.asarray(windows, dtype=np.float32)
+        if windows.ndim == 2:
+            windows = windows[np.newaxis]
+        if windows.shape[1:] != (self.seq_length, self.n_features):
+            raise ValueError(f"expected windows of shape (batch, {self.seq_length}, {self.n_features}), "
+                             f"got {windows.shape}")
+        return self._rollout(steps or self.default_steps)(tf.constant(windows)).numpy()
+
+    def forecast(self, rows, steps=None):
+        """Forecast prices from raw feature rows (bundle feature order), shaped
+        (seq_length, n_features) or (batch, seq_length, n_features)."""
+        if self.bundle is None:
+            raise ValueError("forecast() needs a model bundle for its scalers; use forecast_scaled()")
+        return self.bundle.unscale_target(self.forecast_scaled(self.bundle.scale(rows), steps))
+
+
+class BatchingForecaster:
+    """Coalesce concurrent forecast requests into batched `ForecastService.forecast` calls.
+
+    A worker thread takes the first waiting request, then keeps collecting for
+    up to `max_wait` seconds or until `max_batch` requests are queued, and runs
+    the whole group as one model call (one call per distinct `steps`).
+    """
+
+    def __init__(self, service, max_batch=64, max_wait=0.002):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="forecast-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows, steps=None):
+        """Queue raw feature rows (seq_length, n_features); returns a Future of the prices."""
+        rows = np.asarray(rows, dtype=np.float64)
+        expected = (self.service.seq_length, self.service.n_features)
+        if rows.shape != expected:
+            raise ValueError(f"expected rows of shape {expected}, got {rows.shape}")
+        future = Future()
+        self._queue.put((rows, steps or self.service.default_steps, future))
+        return future
+
+    def forecast(self, rows, steps=None, timeout=None):
+        return self.submit(rows, steps).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            by_steps = {}
+            for rows, steps, future in batch:
+                by_steps.setdefault(steps, []).append((rows, future))
+            for steps, group in by_steps.items():
+                try:
+                    prices = self.service.forecast(np.stack([rows for rows, _ in group]), steps)
+                except Exception as e:
+                    for _, future in group:
+                        future.set_exception(e)
+                    continue
+                for (_, future), result in zip(group, prices):
+                    future.set_result(result)
+                self.batches += 1
+            self.requests += len(batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-step forecasts.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--batch", type=int, default=32, help="windows (instruments) per call")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--jit", action="store_true", help="compile the rollout with XLA")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = ForecastService(args.model, steps=args.steps, jit_compile=args.jit)
+    print(f"Model loaded and rollout compiled in {time.perf_counter() - start:.2f} s")
+
+    windows = np.random.rand(args.batch, service.seq_length, service.n_features).astype(np.float32)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        service.forecast_scaled(windows, args.steps)
+    per_call = (time.perf_counter() - start) / args.repeat
+    print(f"{args.batch} windows x {args.steps} steps: {per_call * 1000:.2f} ms per call, "
+          f"{per_call / args.batch * 1000:.3f} ms per window")
@@ -1,18 +1,9 @@
-import pandas as pd
 import talib
 import matplotlib.pyplot as plt
+from market_data import load_frame
 
-# Load the dataset
-df = pd.read_csv("data/EURUSD_M15.csv")
-
-# Rename columns correctly
-df.columns = ['Date', 'Time', 'Open', 'High', 'Low', 'Close', 'Tick Volume']
-
-# Combine 'Date' and 'Time' into a single datetime column
-df['Datetime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'])
-
-# Drop original 'Date' and 'Time' columns
-df = df[['Datetime', 'Open', 'High', 'Low', 'Close', 'Tick Volume']]
+# Load the dataset (Datetime, Open, High, Low, Close, Tick Volume)
+df = load_frame("data/EURUSD_M15.csv")
 
 # Calculate indicators
 df['SMA_10'] = talib.SMA(df['Close'], timeperiod=10)
@@ -1,106 +1,55 @@
-import pandas as pd
-import talib
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-
-DATA_FILE = "realtime_ticks.csv"
-LOG_FILE = "trade_signals_log.csv"  # File to store Buy/Sell signals
-
-# Initialize plot
-fig, ax = plt.subplots(3, 1, figsize=(12, 8), sharex=True)
+import argparse
 
-def animate(i):
-    """Fetch latest data and update the plot dynamically."""
-    df = pd.read_csv(DATA_FILE)
-
-    # Convert Datetime column
-    df["Datetime"] = pd.to_datetime(df["Datetime"])
-    df = df.tail(500)  # Keep latest 500 rows for performance
+import matplotlib.pyplot as plt
+from partitions import DEFAULT_SYMBOL, DEFAULT_TIMEFRAME, partition_key, signal_path, store_path
+from tick_store import TickStore
+from streaming_indicators import LiveIndicators
+from signal_store import SignalEmitter, SignalStore
+from live_chart import LiveChart
+
+parser = argparse.ArgumentParser(description="Plot live indicators and signals for one symbol/timeframe.")
+parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+args = parser.parse_args()
+symbol, timeframe = partition_key(args.symbol, args.timeframe)
+
+# Tick store written by server.py for this partition (see partitions.py)
+store = TickStore(store_path(symbol, timeframe))
+# Indicators are updated incrementally, one call per new bar
+indicators = LiveIndicators(window=500)
+# Logs each signal once, skipping bars already seen in earlier frames (export with signal_store.py --csv)
+emitter = SignalEmitter(SignalStore(signal_path(symbol, timeframe)))
+
+# Artists are created once; each frame only moves their data (see live_chart.py)
+chart = LiveChart(window=500)
+
+def animate():
+    """Feed new bars to the indicators and redraw the chart; frames without a new bar do nothing."""
+    rows = len(store)
+    if rows == indicators.bars:
+        return
+    # Feed only the bars that arrived since the last frame into the indicators
+    new_bars = store.read(indicators.bars, rows)
+    indicators.update_many(new_bars["Datetime"], new_bars["Close"])
+    df = indicators.frame()  # Latest 500 bars with their indicator values
 
     # Ensure enough data for indicators
-    if len(df) >= 50:
-        df['SMA_10'] = talib.SMA(df['Close'], timeperiod=10)
-        df['SMA_50'] = talib.SMA(df['Close'], timeperiod=50)
-        df['EMA_10'] = talib.EMA(df['Close'], timeperiod=10)
-        macd, signal, hist = talib.MACD(df['Close'], fastperiod=12, slowperiod=26, signalperiod=9)
-        df['MACD'] = macd
-        df['MACD_Signal'] = signal
-        df['MACD_Hist'] = hist
-
-        df["Distance_SMA50_EMA10"] = -(df["SMA_50"] - df["EMA_10"])
-
-        # Identify Buy and Sell signals
-        df["Buy_Signal"] = (df["Distance_SMA50_EMA10"].shift(1) < 0) & (df["Distance_SMA50_EMA10"] > 0)
-        df["Sell_Signal"] = (df["Distance_SMA50_EMA10"].shift(1) > 0) & (df["Distance_SMA50_EMA10"] < 0)
-
-        # Log Buy/Sell signals
-        trade_signals = df[df["Buy_Signal"] | df["Sell_Signal"]][["Datetime", "Close", "Buy_Signal", "Sell_Signal"]]
-        if not trade_signals.empty:
-            trade_signals.to_csv(LOG_FILE, mode='a', header=not pd.io.common.file_exists(LOG_FILE), index=False)
-
-    else:
+    if len(df) < 50:
         print(f"Waiting for more data... {len(df)}/50 rows available.")
         return  # Skip this frame if not enough data
 
-    ax[0].clear()
-    ax[1].clear()
-    ax[2].clear()
-
-    # **Price Chart with SMA & EMA**
-    ax[0].plot(df.index, df["Close"], label="Close Price", color="black", linewidth=1)
-    if "SMA_10" in df.columns:
-        ax[0].plot(df.index, df["SMA_10"], label="SMA 10", color="blue", linestyle="dashed")
-    if "SMA_50" in df.columns:
-        ax[0].plot(df.index, df["SMA_50"], label="SMA 50", color="red", linestyle="dotted")
-    if "EMA_10" in df.columns:
-        ax[0].plot(df.index, df["EMA_10"], label="EMA 10", color="green", linestyle="dashdot")
-
-    # **Vertical Lines Every 500 Ticks**
-    for tick in range(0, len(df), 49):
-        ax[0].axvline(x=df.index[tick], color='purple', linestyle='dashed', linewidth=1, alpha=0.8)
-        ax[0].text(df.index[tick], df["SMA_10"].min(), df["Datetime"].iloc[tick].strftime('%H:%M:%S'),
-           rotation=0, fontsize=6, color='white', ha='right', va='top', bbox=dict(facecolor='purple', alpha=0.5))
-        ax[1].axvline(x=df.index[tick], color='purple', linestyle='dashed', linewidth=1, alpha=0.8)
-        ax[2].axvline(x=df.index[tick], color='purple', linestyle='dashed', linewidth=1, alpha=0.8)
-
-
-    ax[0].set_title("Price with SMA & EMA")
-    ax[0].legend()
-    ax[0].grid()
-
-    # **MACD Chart**
-    ax[1].plot(df.index, df["MACD"], label="MACD", color="blue")
-    ax[1].plot(df.index, df["MACD_Signal"], label="Signal Line", color="red", linestyle="dashed")
-    # ax[1].bar(df["Datetime"], df["MACD_Hist"].where(df["MACD_Hist"] >= 0), color="green", alpha=0.8, label="MACD Positive")
-    # ax[1].bar(df["Datetime"], df["MACD_Hist"].where(df["MACD_Hist"] < 0), color="red", alpha=0.8, label="MACD Negative")
-
-    ax[1].bar(df.index, df["MACD_Hist"].where(df["MACD_Hist"] >= 0), color="green", alpha=0.6, width=0.005, label="MACD Positive")
-    ax[1].bar(df.index, df["MACD_Hist"].where(df["MACD_Hist"] < 0), color="red", alpha=0.6, width=0.005, label="MACD Negative")
-
-    ax[1].set_title("MACD Indicator")
-    ax[1].legend()
-    ax[1].grid()
-
-    # **Distance Between SMA_50 and EMA_10**
-    ax[2].plot(df.index, df["Distance_SMA50_EMA10"], label="Distance (SMA50 - EMA10)", color="purple", linewidth=1.5)
-    ax[2].fill_between(df.index, df["Distance_SMA50_EMA10"], color="purple", alpha=0.3)  # Shaded area for better visibility
-    ax[2].set_title("Distance Between SMA_50 and EMA_10")
-
-    # Plot the buy / sell entry 
-    buy_signals = df[df["Buy_Signal"]]
-    sell_signals = df[df["Sell_Signal"]]
-    buy_y = [0] * len(buy_signals)  # Creates a list of zeros with the same length as buy_signals
-    sell_y = [0] * len(sell_signals)
-    ax[2].scatter(buy_signals.index, buy_y, color='green', label='Buy Signal', marker='^', s=100)
-    ax[2].scatter(sell_signals.index, sell_y, color='red', label='Sell Signal', marker='v', s=100)
-        
+    # Identify Buy and Sell signals
+    df["Buy_Signal"] = (df["Distance_SMA50_EMA10"].shift(1) < 0) & (df["Distance_SMA50_EMA10"] > 0)
+    df["Sell_Signal"] = (df["Distance_SMA50_EMA10"].shift(1) > 0) & (df["Distance_SMA50_EMA10"] < 0)
 
-    ax[2].legend()
-    ax[2].grid()
+    # Log Buy/Sell signals on bars that are new since the last frame
+    emitter.process(df)
 
-    plt.xticks(rotation=45)
+    # The chart keeps its own buffers and copies only the new bars
+    chart.follow(indicators)
+    chart.refresh()
 
 
 # **Run Live Animation**
-ani = animation.FuncAnimation(fig, animate, interval=1000)  # Update every second
+chart.start(animate, interval=1000)  # Update every second
 plt.show()
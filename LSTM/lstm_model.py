@@ -0,0 +1,18 @@
+"""The LSTM trend model architecture, shared by train.py and walk_forward.py."""
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+
+
+def build_model(seq_length=50, n_features=2):
+    """Two stacked LSTM layers predicting the next scaled close."""
+    model = Sequential([
+        Input(shape=(seq_length, n_features)),
+        LSTM(50, return_sequences=True),
+        Dropout(0.2),
+        LSTM(50, return_sequences=False),
+        Dropout(0.2),
+        Dense(25, activation='relu'),
+        Dense(1)
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
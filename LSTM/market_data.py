@@ -0,0 +1,168 @@
+"""Shared loader for MT5 bar exports, with a binary cache.
+
+MT5 exports (Date, Time, Open, High, Low, Close, Tick volume) are parsed once
+with explicit formats and normalized to the tick store schema:
+
+    Datetime, Open, High, Low, Close, Tick Volume
+
+The parsed columns are cached next to the CSV as a tick_store.TickStore
+(`.market_data/<name>.store`), tagged with the source path, size and
+modification time. Later loads memory-map the cached columns instead of
+re-reading the text, and a changed CSV is simply re-parsed.
+
+    python market_data.py data/EURUSD_M15.csv
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from tick_store import COLUMNS, TickStore
+
+DATE_FORMAT = "%Y.%m.%d"
+DATETIME_FORMAT = "%Y.%m.%d %H:%M:%S"
+MT5_COLUMNS = ['Date', 'Time', 'Open', 'High', 'Low', 'Close', 'Tick Volume']
+CACHE_DIR = ".market_data"
+SOURCE_FILE = "source.json"
+
+
+def _ns(values, unit="datetime64[ns]"):
+    # Parsers may return second resolution; always hand back int64 nanoseconds
+    return np.asarray(values).astype(unit).view("i8")
+
+
+def _parse_repeated(values, parse):
+    """Parse each distinct string once; dates and times repeat heavily in bar data."""
+    codes, uniques = pd.factorize(values)
+    return parse(uniques)[codes]
+
+
+def parse_datetimes(df):
+    """int64 ns timestamps from Date + Time columns, or from a Datetime column."""
+    if "Datetime" in df.columns:
+        values = df["Datetime"]
+        if values.dtype.kind in "iuM":
+            return _ns(values)
+        return _parse_repeated(values, lambda u: _ns(pd.to_datetime(u, format="mixed")))
+    dates = _parse_repeated(df["Date"], lambda u: _ns(pd.to_datetime(u, format=DATE_FORMAT)))
+    times = _parse_repeated(df["Time"], lambda u: _ns(pd.to_timedelta(u), "timedelta64[ns]"))
+    return dates + times
+
+
+def normalize(df):
+    """Raw CSV chunk -> dict of columns in the tick store schema."""
+    if "Datetime" not in df.columns and len(df.columns) == len(MT5_COLUMNS):
+        # MT5 exports differ in header spelling ('Tick volume' vs 'Tick Volume', <DATE>, ...)
+        df.columns = MT5_COLUMNS
+    df = df.rename(columns={"Tick volume": "Tick Volume", "Volume": "Tick Volume"})
+    columns = {"Datetime": parse_datetimes(df)}
+    for name in COLUMNS:
+        if name != "Datetime":
+            columns[name] = df[name].to_numpy(dtype=COLUMNS[name])
+    return columns
+
+
+def _source_key(csv_file):
+    stat = os.stat(csv_file)
+    return {"path": os.path.abspath(csv_file), "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cache_path(csv_file):
+    directory, name = os.path.split(os.path.abspath(csv_file))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + ".store")
+
+
+def build_cache(csv_file, store_path=None, chunksize=500_000):
+    """Parse `csv_file` chunk by chunk into a TickStore; returns its path."""
+    store_path = store_path or cache_path(csv_file)
+    key = _source_key(csv_file)
+    # A private build directory, so concurrent builders never touch each other's work
+    parent = os.path.dirname(os.path.abspath(store_path))
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(store_path) + ".", suffix=".tmp", dir=parent)
+    try:
+        with TickStore(tmp, mode="a") as store:
+            for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+                store.append_columns(normalize(chunk))
+        with open(os.path.join(tmp, SOURCE_FILE), "w") as f:
+            json.dump(key, f)
+        # Swap the finished cache in so a reader never sees a half-built one
+        try:
+            os.replace(tmp, store_path)
+        except OSError:
+            # An older cache is in the way: move it aside under a private name, then retry
+            old = tempfile.mkdtemp(prefix=os.path.basename(store_path) + ".", suffix=".old", dir=parent)
+            os.replace(store_path, os.path.join(old, "store"))
+            os.replace(tmp, store_path)
+            shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return store_path
+
+
+def open_store(csv_file):
+    """The cached TickStore for `csv_file`, (re)built if missing or stale."""
+    store_path = cache_path(csv_file)
+    try:
+        with open(os.path.join(store_path, SOURCE_FILE)) as f:
+            fresh = json.load(f) == _source_key(csv_file)
+    except (OSError, ValueError):
+        fresh = False
+    if not fresh:
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        build_cache(csv_file, store_path)
+    return TickStore(store_path)
+
+
+def load_columns(csv_file, cache=True):
+    """All columns as NumPy arrays (read-only memory maps when cached); Datetime is datetime64[ns]."""
+    if cache:
+        try:
+            with open_store(csv_file) as store:
+                columns = store.read()
+        except OSError as e:
+            print(f"market_data: not caching {csv_file}: {e}")
+            columns = normalize(pd.read_csv(csv_file))
+    else:
+        columns = normalize(pd.read_csv(csv_file))
+    columns["Datetime"] = np.asarray(columns["Datetime"]).view("datetime64[ns]")
+    return columns
+
+
+def load_frame(csv_file, index=False, cache=True):
+    """Bars as a DataFrame with the normalized columns, optionally indexed by Datetime."""
+    df = pd.DataFrame({name: np.array(values) for name, values in load_columns(csv_file, cache).items()})
+    return df.set_index("Datetime") if index else df
+
+
+def iter_features(csv_file, columns, chunksize=200_000, start_row=0, stop_row=None):
+    """Yield float32 arrays of `columns` for rows [start_row, stop_row), one chunk at a time."""
+    with open_store(csv_file) as store:
+        stop_row = len(store) if stop_row is None else min(stop_row, len(store))
+        for lo in range(start_row, stop_row, chunksize):
+            chunk = store.read(lo, min(lo + chunksize, stop_row))
+            yield np.column_stack([chunk[name] for name in columns]).astype(np.float32)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python market_data.py <mt5_export.csv>")
+        sys.exit(1)
+    csv_file = sys.argv[1]
+
+    start = time.perf_counter()
+    df = pd.read_csv(csv_file)
+    df.columns = MT5_COLUMNS
+    pd.to_datetime(df['Date'] + ' ' + df['Time'])
+    print(f"read_csv + inferred to_datetime: {time.perf_counter() - start:.2f} s")
+
+    for label in ("cold (parse and cache)", "warm (cached)"):
+        if label.startswith("cold"):
+            shutil.rmtree(cache_path(csv_file), ignore_errors=True)
+        start = time.perf_counter()
+        frame = load_frame(csv_file)
+        print(f"load_frame {label}: {time.perf_counter() - start:.2f} s, {len(frame)} rows")
@@ -0,0 +1,231 @@
+"""Versioned artifact bundle for the LSTM trend model.
+
+A bundle is a directory holding everything inference needs, so predictions
+never depend on re-fitting scalers to whatever data happens to be at hand:
+
+    lstm_trend_model.bundle/
+        manifest.json   features, seq_length, scaler min/max, training data fingerprint
+        model.h5        the trained Keras model
+        cache/          architecture + raw weights, written on first load
+
+The manifest is plain JSON and the scaler is pure NumPy, so reading the schema
+and scaling inputs needs neither scikit-learn nor TensorFlow. The model itself
+is only deserialized when `Bundle.model` is first used; after the first load
+the weights are read back from cache/ (architecture JSON + .npz), which skips
+the HDF5 parse. Loaded bundles are also kept in-process, keyed by path and
+file modification times.
+
+Wrap an existing .h5 model, fitting the scalers on its training CSV:
+
+    python model_bundle.py lstm_trend_model.bundle --from-model lstm_trend_model.h5 --csv data/EURUSD_M15.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+BUNDLE_PATH = "lstm_trend_model.bundle"
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.h5"
+CACHE_DIR = "cache"
+
+# Feature names from older bundles -> market_data column names
+FEATURE_ALIASES = {"Tick volume": "Tick Volume"}
+
+_loaded = {}
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """sha256 and size of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+            size += len(block)
+    return {"source": os.path.basename(path), "sha256": digest.hexdigest(), "bytes": size}
+
+
+class FeatureScaler:
+    """Per-column min/max scaling, identical to sklearn's MinMaxScaler((0, 1)) after fit."""
+
+    def __init__(self, data_min, data_max):
+        self.data_min = np.asarray(data_min, dtype=np.float64)
+        self.data_max = np.asarray(data_max, dtype=np.float64)
+        data_range = self.data_max - self.data_min
+        # Constant columns scale to 0, as in sklearn
+        self.scale = 1.0 / np.where(data_range == 0, 1.0, data_range)
+
+    @classmethod
+    def fit(cls, data):
+        data = np.asarray(data, dtype=np.float64)
+        return cls(np.nanmin(data, axis=0), np.nanmax(data, axis=0))
+
+    def transform(self, data):
+        return ((np.asarray(data, dtype=np.float64) - self.data_min) * self.scale).astype(np.float32)
+
+    def inverse_transform(self, data):
+        return np.asarray(data, dtype=np.float64) / self.scale + self.data_min
+
+    def inverse_column(self, values, column=0):
+        """Undo the scaling of one column, e.g. predicted closes."""
+        return np.asarray(values, dtype=np.float64) / self.scale[column] + self.data_min[column]
+
+
+class Bundle:
+    """Manifest and scaler of a saved model; the Keras model loads on first access."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.features = [FEATURE_ALIASES.get(name, name) for name in manifest["features"]]
+        self.seq_length = manifest["seq_length"]
+        self.target_column = manifest["target_column"]
+        self.scaler = FeatureScaler(manifest["scaler"]["data_min"], manifest["scaler"]["data_max"])
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = _load_model(self.path)
+        return self._model
+
+    def scale(self, data):
+        """Raw feature rows (in `features` order) -> model inputs."""
+        return self.scaler.transform(data)
+
+    def unscale_target(self, values):
+        return self.scaler.inverse_column(values, self.target_column)
+
+
+def save_bundle(path, model, features, seq_length, data_min, data_max, fingerprint=None, target_column=0):
+    """Write a bundle directory; an existing bundle at `path` is replaced."""
+    path = path.rstrip("/\\")
+    # A private build directory, so concurrent saves never touch each other's work
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=parent)
+    try:
+        _write_bundle(tmp, model, features, seq_length, data_min, data_max, fingerprint, target_column)
+        # Swap the finished bundle in so readers never see a half-written one
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # An older bundle is in the way: move it aside under a private name, then retry
+            old = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", suffix=".old", dir=parent)
+            os.replace(path, os.path.join(old, "bundle"))
+            os.replace(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    _loaded.pop(os.path.realpath(path), None)
+    return path
+
+
+def _write_bundle(tmp, model, features, seq_length, data_min, data_max, fingerprint, target_column):
+    model.save(os.path.join(tmp, MODEL_FILE))
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "features": list(features),
+        "target_column": target_column,
+        "seq_length": seq_length,
+        "scaler": {
+            "type": "minmax",
+            "feature_range": [0, 1],
+            "data_min": np.asarray(data_min, dtype=float).tolist(),
+            "data_max": np.asarray(data_max, dtype=float).tolist(),
+        },
+        "training_data": fingerprint,
+    }
+    with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """Load a bundle's manifest and scaler, reusing the in-process copy if the files are unchanged."""
+    real = os.path.realpath(path)
+    manifest_file = os.path.join(real, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        raise FileNotFoundError(f"{path} is not a model bundle (no {MANIFEST_FILE}); create it with "
+                                f"`python train.py --bundle {path}` or wrap an existing Keras model with "
+                                f"`python model_bundle.py {path} --from-model lstm_trend_model.h5`")
+    key = (os.stat(manifest_file).st_mtime_ns, os.stat(os.path.join(real, MODEL_FILE)).st_mtime_ns)
+    cached = _loaded.get(real)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(manifest_file) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported bundle format {manifest.get('format_version')}")
+    bundle = Bundle(real, manifest)
+    _loaded[real] = (key, bundle)
+    return bundle
+
+
+def _load_model(path):
+    """Keras model of a bundle, from cache/ when it matches model.h5, else from the HDF5 file."""
+    from tensorflow.keras.models import load_model, model_from_json
+
+    model_file = os.path.join(path, MODEL_FILE)
+    cache = os.path.join(path, CACHE_DIR)
+    stat = os.stat(model_file)
+    key = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    try:
+        with open(os.path.join(cache, "key.json")) as f:
+            if json.load(f) == key:
+                with open(os.path.join(cache, "architecture.json")) as f:
+                    model = model_from_json(f.read())
+                with np.load(os.path.join(cache, "weights.npz")) as weights:
+                    model.set_weights([weights[f"w{i}"] for i in range(len(weights.files))])
+                return model
+    except (OSError, ValueError):
+        pass
+
+    model = load_model(model_file, compile=False)
+    try:
+        os.makedirs(cache, exist_ok=True)
+        with open(os.path.join(cache, "architecture.json"), "w") as f:
+            f.write(model.to_json())
+        np.savez(os.path.join(cache, "weights.npz"), **{f"w{i}": w for i, w in enumerate(model.get_weights())})
+        # The key goes last, so an interrupted write is simply rebuilt next time
+        with open(os.path.join(cache, "key.json"), "w") as f:
+            json.dump(key, f)
+    except OSError as e:
+        print(f"Could not write model cache in {cache}: {e}")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or inspect an LSTM model bundle.")
+    parser.add_argument("bundle", nargs="?", default=BUNDLE_PATH)
+    parser.add_argument("--from-model", default=None, help="wrap this .h5 model into the bundle")
+    parser.add_argument("--csv", default="data/EURUSD_M15.csv", help="training data the scalers are fitted on")
+    parser.add_argument("--features", default="Close,Tick Volume")
+    parser.add_argument("--seq-length", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.from_model:
+        from tensorflow.keras.models import load_model
+        from market_data import load_columns
+
+        features = args.features.split(",")
+        bars = load_columns(args.csv)
+        data = np.column_stack([bars[name] for name in features]).astype(np.float64)
+        save_bundle(args.bundle, load_model(args.from_model, compile=False), features, args.seq_length,
+                    data.min(axis=0), data.max(axis=0), file_fingerprint(args.csv))
+        print(f"Wrote {args.bundle}")
+
+    start = time.perf_counter()
+    bundle = load_bundle(args.bundle)
+    print(f"Manifest loaded in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(json.dumps(bundle.manifest, indent=2))
+    start = time.perf_counter()
+    bundle.model
+    print(f"Model loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
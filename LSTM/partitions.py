@@ -0,0 +1,338 @@
+"""Ticks partitioned by symbol and timeframe, each partition with its own store and strategy.
+
+Every (symbol, timeframe) pair gets a tick store of its own under STORE_ROOT,
+
+    ticks/
+        EURUSD/M15.store
+        USDJPY/M15.store
+        USDJPY/H1.store
+
+and, in the server, its own writer buffer, recent-rows window, trading engine
+and dashboard feed. Partitions share no locks after they are created, so a
+burst of EURUSD ticks never waits on USDJPY's buffer or strategy: each
+engine runs in its own thread and only sees its own bars. Partitions are
+created on the first tick for their pair; the only shared lock guards that
+creation.
+
+Ticks without "symbol" / "timeframe" fields go to DEFAULT_SYMBOL and
+DEFAULT_TIMEFRAME, so single-stream clients keep working.
+
+Raw bid/ask ticks (`Partitions.ingest_raw`) go through one BarAggregator per
+symbol (see bar_aggregator.py); every bar it closes is ingested into that
+symbol's partition for the bar's timeframe like a posted bar. A background
+thread closes the last bar of a symbol whose ticks stop once its period has
+passed, so a quiet market does not hold back its final bar. Move an existing
+single-stream store into place with
+
+    mkdir -p ticks/EURUSD && mv realtime_ticks.store ticks/EURUSD/M15.store
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from bar_aggregator import DEFAULT_TIMEFRAMES, TIMEFRAME_SECONDS, BarAggregator
+from event_hub import DashboardFeed
+from tick_store import TickStore
+from tick_writer import INT64_MAX, BufferedTickWriter, parse_timestamp
+from trading_engine import StrategyConfig, TradingEngine, print_order
+
+STORE_ROOT = "ticks"
+DEFAULT_SYMBOL = "EURUSD"
+DEFAULT_TIMEFRAME = "M15"
+# MetaTrader 5 timeframe names
+TIMEFRAMES = ("M1", "M2", "M3", "M4", "M5", "M6", "M10", "M12", "M15", "M20", "M30",
+              "H1", "H2", "H3", "H4", "H6", "H8", "H12", "D1", "W1", "MN1")
+# Broker symbols, including suffixes such as "EURUSD.m" or "XAUUSD#"; also used as directory names
+SYMBOL_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._#-]{0,31}")
+# Seconds between checks for bars a quiet symbol should close, and the allowance for ticks arriving late
+BAR_CLOSE_INTERVAL = 1.0
+BAR_CLOSE_GRACE = 2.0
+
+
+def partition_key(symbol=None, timeframe=None):
+    """Validated (symbol, timeframe); missing values fall back to the defaults. Raises ValueError."""
+    symbol = DEFAULT_SYMBOL if symbol is None else str(symbol)
+    timeframe = DEFAULT_TIMEFRAME if timeframe is None else str(timeframe).upper()
+    if not SYMBOL_PATTERN.fullmatch(symbol):
+        raise ValueError(f"Invalid symbol {symbol!r}")
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Invalid timeframe {timeframe!r}, expected one of {', '.join(TIMEFRAMES)}")
+    return symbol, timeframe
+
+
+def tick_partition(tick):
+    """(symbol, timeframe) of an incoming tick payload."""
+    return partition_key(tick.get("symbol"), tick.get("timeframe"))
+
+
+def raw_tick(tick):
+    """(symbol, time in ns, bid, ask) of a raw tick payload. Raises KeyError / ValueError / TypeError.
+
+    The time is "time_msc" (ms since the epoch, as in MT5's MqlTick) or "time",
+    either seconds since the epoch or an ISO 8601 string.
+    """
+    symbol, _ = partition_key(tick.get("symbol"))
+    try:
+        if "time_msc" in tick:
+            time_ns = int(tick["time_msc"]) * 1_000_000
+        elif isinstance(tick["time"], str):
+            time_ns = int(parse_timestamp(tick["time"]).astype(np.int64))
+        else:
+            time_ns = int(float(tick["time"]) * 1_000_000_000)
+    except OverflowError as e:
+        raise ValueError(f"time must be a finite number, got {tick.get('time_msc', tick.get('time'))!r}") from e
+    # Bars are built on int64 ns (the lowest value is NaT)
+    if not -INT64_MAX <= time_ns <= INT64_MAX:
+        raise ValueError(f"time {tick.get('time_msc', tick.get('time'))!r} is out of range")
+    bid = float(tick["bid"])
+    ask = float(tick.get("ask", bid))
+    if not (math.isfinite(bid) and math.isfinite(ask)):
+        raise ValueError(f"bid and ask must be finite numbers, got {bid!r} / {ask!r}")
+    return symbol, time_ns, bid, ask
+
+
+def bar_row(row):
+    """Aggregated bar row (ns start time) -> row like tick_to_row's, with a datetime64 timestamp."""
+    return (np.datetime64(row[0], "ns"),) + tuple(row[1:])
+
+
+def store_path(symbol, timeframe, root=STORE_ROOT):
+    return os.path.join(root, symbol, f"{timeframe}.store")
+
+
+def dead_letter_path(symbol, timeframe, root=STORE_ROOT):
+    """CSV of rows the writer could not get into the partition's store (see BufferedTickWriter)."""
+    return os.path.join(root, symbol, f"{timeframe}.deadletter.csv")
+
+
+def signal_path(symbol, timeframe, root=STORE_ROOT):
+    """Signal store of a partition (see signal_store.py), next to its ticks."""
+    return os.path.join(root, symbol, f"{timeframe}.signals.bin")
+
+
+def strategy_config(symbol, **overrides):
+    """StrategyConfig for `symbol`: JPY pairs quote 3 decimals instead of 5, so a pip is 0.01."""
+    if "pip_factor" not in overrides and "JPY" in symbol.upper():
+        overrides["pip_factor"] = 1000
+    return StrategyConfig(**overrides)
+
+
+def list_partitions(root=STORE_ROOT):
+    """(symbol, timeframe) of every partition store found under `root`."""
+    found = []
+    if not os.path.isdir(root):
+        return found
+    for symbol in sorted(os.listdir(root)):
+        folder = os.path.join(root, symbol)
+        if os.path.isdir(folder):
+            found += [(symbol, name[:-len(".store")]) for name in sorted(os.listdir(folder))
+                      if name.endswith(".store")]
+    return found
+
+
+class Partition:
+    """The server-side state of one symbol/timeframe stream."""
+
+    def __init__(self, symbol, timeframe, root=STORE_ROOT, writer_options=None, run_strategy=False,
+                 dashboard_interval=0.1, recent_rows=1024):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        writer_options = {"dead_letter": dead_letter_path(symbol, timeframe, root), **(writer_options or {})}
+        self.writer = BufferedTickWriter(TickStore(store_path(symbol, timeframe, root), mode="a"),
+                                         **writer_options).start()
+        self.recent = deque(maxlen=recent_rows)
+        self.recent_lock = threading.Lock()
+        self.engine = TradingEngine(strategy_config(symbol), broker=self._broker).start() if run_strategy else None
+        # With the strategy running the dashboard shows the engine's bars, otherwise its own
+        self.feed = DashboardFeed(interval=dashboard_interval)
+        if self.engine is not None:
+            self.feed.attach(self.engine)
+        self.feed.start()
+
+    @property
+    def name(self):
+        return f"{self.symbol} {self.timeframe}"
+
+    def _broker(self, order):
+        order["symbol"], order["timeframe"] = self.symbol, self.timeframe
+        print_order(order)
+
+    def ingest(self, rows):
+        """Store rows (ordered like TICK_COLUMNS) and hand them to the strategy or the dashboard."""
+        self.writer.write_many(rows)
+        with self.recent_lock:
+            self.recent.extend(rows)
+        if self.engine is not None:
+            for row in rows:
+                self.engine.submit(row[0], row[4])
+        else:
+            for row in rows:
+                self.feed.on_tick(row[0], row[4])
+
+    def backlog(self):
+        """Rows received but not yet written or traded on."""
+        backlog = self.writer.pending()
+        if self.engine is not None:
+            backlog += self.engine.queue.qsize()
+        return backlog
+
+    def recent_window(self, n):
+        """The last `n` rows received (fewer if not enough have arrived yet)."""
+        with self.recent_lock:
+            return list(self.recent)[-n:]
+
+    def status(self):
+        status = {"symbol": self.symbol, "timeframe": self.timeframe,
+                  "rows": self.writer.rows_written + self.writer.pending(),
+                  "failed_flushes": self.writer.failed_flushes, "dead_lettered": self.writer.dead_lettered,
+                  "viewers": len(self.feed.hub.subscribers)}
+        if self.engine is not None:
+            status["bars"] = self.engine.bars
+            status["position_open"] = self.engine.position_open
+            status["engine_errors"] = self.engine.errors
+            status["engine_dropped"] = self.engine.dropped
+        return status
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.stop()
+        self.feed.stop()
+        self.writer.close()
+
+
+class Partitions:
+    """All partitions of a server, created on first use."""
+
+    def __init__(self, root=STORE_ROOT, aggregate_timeframes=DEFAULT_TIMEFRAMES, bar_close_interval=BAR_CLOSE_INTERVAL,
+                 **partition_options):
+        unknown = [name for name in aggregate_timeframes if name not in TIMEFRAME_SECONDS]
+        if unknown:
+            raise ValueError(f"Cannot aggregate ticks into {unknown}, expected some of {', '.join(TIMEFRAME_SECONDS)}")
+        self.root = root
+        self.aggregate_timeframes = tuple(aggregate_timeframes)
+        self.bar_close_interval = bar_close_interval
+        self.partition_options = partition_options
+        self._partitions = {}
+        self._aggregators = {}
+        self._last_tick_at = {}  # symbol -> time.monotonic() of its last raw ticks
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._closer = None
+
+    def get(self, symbol, timeframe):
+        """The partition for a validated (symbol, timeframe), created if needed."""
+        key = (symbol, timeframe)
+        # Lookups of existing partitions take no lock
+        partition = self._partitions.get(key)
+        if partition is None:
+            with self._lock:
+                partition = self._partitions.get(key)
+                if partition is None:
+                    partition = Partition(symbol, timeframe, self.root, **self.partition_options)
+                    self._partitions[key] = partition
+        return partition
+
+    def find(self, symbol, timeframe):
+        """The partition if it has been created, else None."""
+        return self._partitions.get((symbol, timeframe))
+
+    @staticmethod
+    def group(ticks, to_row):
+        """{(symbol, timeframe): rows} of tick payloads, validating every tick. Raises on the first bad one."""
+        groups = {}
+        for tick in ticks:
+            groups.setdefault(tick_partition(tick), []).append(to_row(tick))
+        return groups
+
+    def ingest(self, ticks, to_row):
+        """Route tick payloads to their partitions, one write per partition; returns the row count.
+
+        Every tick is validated before anything is written, so a bad tick rejects the whole batch.
+        """
+        groups = self.group(ticks, to_row)
+        for key, rows in groups.items():
+            self.get(*key).ingest(rows)
+        return sum(len(rows) for rows in groups.values())
+
+    def aggregator(self, symbol):
+        """The BarAggregator building `symbol`'s bars from raw ticks, created if needed."""
+        aggregator = self._aggregators.get(symbol)
+        if aggregator is None:
+            with self._lock:
+                aggregator = self._aggregators.get(symbol)
+                if aggregator is None:
+                    aggregator = BarAggregator(self.aggregate_timeframes)
+                    aggregator.add_listener(lambda timeframe, row: self.get(symbol, timeframe).ingest((bar_row(row),)))
+                    self._aggregators[symbol] = aggregator
+                    if self._closer is None and self.bar_close_interval:
+                        self._closer = threading.Thread(target=self._close_quiet_bars, name="bar-closer", daemon=True)
+                        self._closer.start()
+        return aggregator
+
+    def ingest_raw(self, ticks):
+        """Aggregate raw bid/ask tick payloads into bars, per symbol; returns the tick count.
+
+        Every tick is validated before any is aggregated, so a bad tick rejects the whole batch.
+        """
+        for symbol, (times, bids, asks) in self.group_raw(ticks).items():
+            self.aggregate(symbol, times, bids, asks)
+        return len(ticks)
+
+    @staticmethod
+    def group_raw(ticks):
+        """{symbol: (times, bids, asks)} of raw tick payloads, validating every tick. Raises on the first bad one."""
+        groups = {}
+        for tick in ticks:
+            symbol, time_ns, bid, ask = raw_tick(tick)
+            group = groups.setdefault(symbol, ([], [], []))
+            group[0].append(time_ns)
+            group[1].append(bid)
+            group[2].append(ask)
+        return groups
+
+    def aggregate(self, symbol, times, bids, asks):
+        """Feed one symbol's raw ticks to its aggregator."""
+        aggregator = self.aggregator(symbol)
+        with aggregator.lock:
+            aggregator.add_many(times, bids, asks)
+            self._last_tick_at[symbol] = time.monotonic()
+
+    def _close_quiet_bars(self):
+        """Close the open bars of symbols whose ticks stopped, as if their clock kept running.
+
+        A symbol's clock is its last tick time plus the wall time since that tick
+        arrived, less BAR_CLOSE_GRACE for ticks still on their way. Only elapsed
+        time is used, so broker time zones and replays of old data are handled alike.
+        """
+        while not self._stop.wait(self.bar_close_interval):
+            now = time.monotonic()
+            for symbol, aggregator in list(self._aggregators.items()):
+                with aggregator.lock:
+                    idle = now - self._last_tick_at.get(symbol, now) - BAR_CLOSE_GRACE
+                    if aggregator.ticks and idle > 0:
+                        aggregator.close_until(aggregator.last_time + int(idle * 1_000_000_000))
+
+    def aggregator_status(self):
+        return [{"symbol": symbol, "ticks": aggregator.ticks, "late": aggregator.late}
+                for symbol, aggregator in list(self._aggregators.items())]
+
+    def __iter__(self):
+        return iter(list(self._partitions.values()))
+
+    def __len__(self):
+        return len(self._partitions)
+
+    def close(self):
+        self._stop.set()
+        if self._closer is not None:
+            self._closer.join()
+            self._closer = None
+        with self._lock:
+            partitions, self._partitions = list(self._partitions.values()), {}
+        for partition in partitions:
+            partition.close()
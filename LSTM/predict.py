@@ -1,57 +1,44 @@
-import numpy as np
-import pandas as pd
-import tensorflow as tf
 import matplotlib.pyplot as plt
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
+from forecast_service import ForecastService
+from market_data import load_frame
+from model_bundle import load_bundle
+from windowing import last_window
 
 # File paths
-model_path = "lstm_trend_model.h5"  
+model_path = "lstm_trend_model.bundle"
 test_data_path = "data/test.csv"  
 
-# Load the trained LSTM model
-model = load_model(model_path)
+# Load the trained model bundle once (FileNotFoundError says how to create it);
+# the whole rollout runs as one compiled call
+bundle = load_bundle(model_path)
+service = ForecastService(model_path)
 
-# Load test data
-df_real_time = pd.read_csv(test_data_path)
+# Load test data, indexed by Datetime
+df_real_time = load_frame(test_data_path, index=True)
 
-# Convert Date and Time into a datetime format if applicable
-if 'Date' in df_real_time.columns and 'Time' in df_real_time.columns:
-    df_real_time['Datetime'] = pd.to_datetime(df_real_time['Date'] + ' ' + df_real_time['Time'])
-    df_real_time.set_index('Datetime', inplace=True)
+# Use the features the model was trained on, in the same order
+data = df_real_time[bundle.features].copy()
 
-# Use only 'Close' price
-data = df_real_time[['Close']].copy()
-
-# Normalize data
-scaler = MinMaxScaler(feature_range=(0, 1))
-data_scaled = scaler.fit_transform(data)
+# Normalize data with the scalers saved at training time
+data_scaled = bundle.scale(data.to_numpy())
 
 # Sequence length
-seq_length = 50
+seq_length = bundle.seq_length
 
 # Extract the last `seq_length` values for prediction
-last_seq = np.array(data_scaled[-seq_length:]).reshape(1, seq_length, 1)
+last_seq = last_window(data_scaled, seq_length)
 
 # Number of future predictions
 num_predictions = 40
-predicted_prices = []
-
-# Iteratively predict the next 20 prices
-for _ in range(num_predictions):
-    # Predict next price
-    predicted_price_scaled = model.predict(last_seq)
 
-    # Convert back to actual price
-    predicted_price = scaler.inverse_transform(predicted_price_scaled.reshape(-1, 1))[0][0]
-    predicted_prices.append(predicted_price)
+# Predict the next 40 prices in a single call
+predicted_scaled = service.forecast_scaled(last_seq, num_predictions)[0]
 
-    # Append prediction to the sequence and remove the oldest value
-    new_seq = np.append(last_seq[:, 1:, :], predicted_price_scaled.reshape(1, 1, 1), axis=1)
-    last_seq = new_seq
+# Convert back to actual price
+predicted_prices = bundle.unscale_target(predicted_scaled)
 
 # Get past 50 actual closing prices
-past_prices = data.iloc[-seq_length:].values.flatten()
+past_prices = data['Close'].iloc[-seq_length:].values
 
 # Generate time steps for past and future predictions
 past_time_steps = list(range(-seq_length, 0))  
@@ -1,75 +1,39 @@
-import numpy as np
-import pandas as pd
-import tensorflow as tf
 import matplotlib.pyplot as plt
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
+from forecast_service import ForecastService
+from market_data import load_frame
+from model_bundle import load_bundle
+from windowing import last_window
 
 # File paths
-model_path = "lstm_trend_model.h5"  
+model_path = "lstm_trend_model.bundle"
 data_path = "data/test.csv"
 
-# Load the trained LSTM model
-model = load_model(model_path)
+# Load the trained model bundle once (FileNotFoundError says how to create it);
+# the whole rollout runs as one compiled call
+bundle = load_bundle(model_path)
+service = ForecastService(model_path)
 
-# Load dataset
-df = pd.read_csv(data_path)
+# Load dataset, indexed by Datetime
+df = load_frame(data_path, index=True)
 
-# Convert Date and Time into a datetime format
-if 'Date' in df.columns and 'Time' in df.columns:
-    df['Datetime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'])
-    df.set_index('Datetime', inplace=True)
+# Use the features the model was trained on ('Close' and 'Tick Volume')
+data = df[bundle.features].copy()
 
-# Drop unnecessary columns
-df.drop(columns=['Date', 'Time'], inplace=True)
-
-# Use 'Close' and 'Tick volume' as input features
-data = df[['Close', 'Tick volume']].copy()
-
-# Normalize data (use same scalers as training)
-scaler_close = MinMaxScaler(feature_range=(0, 1))
-scaler_volume = MinMaxScaler(feature_range=(0, 1))
-
-data_scaled = np.hstack((
-    scaler_close.fit_transform(data[['Close']]),  
-    scaler_volume.fit_transform(data[['Tick volume']])
-))
+# Normalize data with the scalers saved at training time
+data_scaled = bundle.scale(data.to_numpy())
 
 # Define sequence length (lookback window)
-seq_length = 50
+seq_length = bundle.seq_length
 num_predictions = 20  # Predict next 20 closing prices
 
-# Function to create sequences for LSTM input
-def create_sequences(data, seq_length=50):
-    X = []
-    for i in range(len(data) - seq_length):
-        X.append(data[i:i+seq_length])
-    return np.array(X)
-
-# Create sequences (Only take the last available sequence)
-X_test = create_sequences(data_scaled, seq_length)[-1:]
-
-# Predicting Next 20 Close Prices
-predicted_prices = []
-last_seq = X_test  # Start with last observed sequence
-
-for _ in range(num_predictions):
-    # Predict the next price
-    predicted_price_scaled = model.predict(last_seq)
-
-    # Convert back to actual price
-    predicted_price = scaler_close.inverse_transform(predicted_price_scaled.reshape(-1, 1))[0][0]
-    predicted_prices.append(predicted_price)
-
-    # Reuse the last known 'Tick Volume' value
-    last_tick_volume = last_seq[:, -1, 1]  # Extract the last known tick volume
+# Only the most recent window is needed as the starting point
+X_test = last_window(data_scaled, seq_length)
 
-    # Combine the predicted Close price with the last Tick Volume
-    predicted_combined = np.array([[predicted_price_scaled[0, 0], last_tick_volume[0]]]).reshape(1, 1, 2)
+# Predicting Next 20 Close Prices (the last known tick volume is carried forward)
+predicted_scaled = service.forecast_scaled(X_test, num_predictions)[0]
 
-    # Append to sequence
-    new_seq = np.append(last_seq[:, 1:, :], predicted_combined, axis=1)
-    last_seq = new_seq
+# Convert back to actual price
+predicted_prices = bundle.unscale_target(predicted_scaled)
 
 # Extract last 50 actual closing prices for context
 past_prices = data.iloc[-seq_length:]['Close'].values
@@ -1,36 +1,197 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+from flask import Flask, Response, request, jsonify, send_from_directory
+import atexit
 import os
+import threading
+
+from partitions import STORE_ROOT, Partitions, partition_key, tick_partition
+from tick_writer import tick_to_row
 
 # Initialize Flask app
 app = Flask(__name__)
 
-# File to store real-time tick data
-DATA_FILE = "realtime_ticks.csv"
+# Ticks are partitioned by their "symbol" and "timeframe" fields (default
+# EURUSD M15), each partition with its own store under TICK_STORE_ROOT, writer,
+# strategy engine and dashboard feed (see partitions.py). Convert an old
+# realtime_ticks.csv with `python tick_store.py realtime_ticks.csv ticks/EURUSD/M15.store`
+DATA_ROOT = os.environ.get("TICK_STORE_ROOT", STORE_ROOT)
+
+# Writer tuning (rows / seconds between flushes, fsync policy: never | flush | interval)
+FLUSH_ROWS = int(os.environ.get("TICK_FLUSH_ROWS", 5000))
+FLUSH_INTERVAL = float(os.environ.get("TICK_FLUSH_INTERVAL", 0.5))
+FSYNC_POLICY = os.environ.get("TICK_FSYNC", "never")
+
+# Raw bid/ask ticks posted to /ticks/raw are aggregated into bars of these timeframes (see bar_aggregator.py)
+AGGREGATE_TIMEFRAMES = os.environ.get("AGGREGATE_TIMEFRAMES", "M1,M5,M15,H1").split(",")
+
+# Optionally run the trading strategy in-process, one engine per partition, reacting to every received tick
+RUN_STRATEGY = os.environ.get("RUN_STRATEGY") == "1"
+
+# Live dashboard: bars, indicators, signals and orders pushed to browsers over SSE
+# (/stream, viewed at /dashboard). With the strategy running it shows the
+# engine's own bars and orders, otherwise it computes the indicators itself.
+DASHBOARD_INTERVAL = float(os.environ.get("DASHBOARD_INTERVAL", 0.1))
+
+# Forecasts: the most recent rows of each partition are kept in memory to build the model's input
+# window, and concurrent /predict requests are coalesced into batched model calls
+MODEL_BUNDLE = os.environ.get("MODEL_BUNDLE", "lstm_trend_model.bundle")
+PREDICT_MAX_BATCH = int(os.environ.get("PREDICT_MAX_BATCH", 64))
+PREDICT_MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", 2))
+MAX_PREDICT_STEPS = 100
+RECENT_ROWS = 1024
+
+# Row fields the model features are read from (see TICK_COLUMNS)
+FEATURE_FIELDS = {"Open": 1, "High": 2, "Low": 3, "Close": 4, "Tick volume": 5, "Tick Volume": 5}
+
+# Ticks are buffered in memory and appended to each partition's store in batches
+partitions = Partitions(DATA_ROOT, aggregate_timeframes=AGGREGATE_TIMEFRAMES, run_strategy=RUN_STRATEGY, dashboard_interval=DASHBOARD_INTERVAL,
+                        recent_rows=RECENT_ROWS,
+                        writer_options={"flush_rows": FLUSH_ROWS, "flush_interval": FLUSH_INTERVAL,
+                                        "fsync": FSYNC_POLICY})
+atexit.register(partitions.close)
+
+forecaster = None
+forecaster_lock = threading.Lock()
+
+
+def requested_partition(payload=None):
+    """(symbol, timeframe) from the JSON payload or the query string. Raises ValueError."""
+    payload = payload or {}
+    return partition_key(payload.get("symbol", request.args.get("symbol")),
+                         payload.get("timeframe", request.args.get("timeframe")))
+
+
+def get_forecaster():
+    """Load the model bundle on first use (importing TensorFlow takes a few seconds)."""
+    global forecaster
+    with forecaster_lock:
+        if forecaster is None:
+            # A missing bundle or a bare .h5 fails here with how to build one, not later in /predict
+            from model_bundle import load_bundle
+            load_bundle(MODEL_BUNDLE)
+            from forecast_service import BatchingForecaster, ForecastService
+            forecaster = BatchingForecaster(ForecastService(MODEL_BUNDLE), max_batch=PREDICT_MAX_BATCH,
+                                            max_wait=PREDICT_MAX_WAIT_MS / 1000)
+        return forecaster
 
-# Ensure file exists with headers
-if not os.path.exists(DATA_FILE):
-    pd.DataFrame(columns=["Datetime", "Open", "High", "Low", "Close", "Tick Volume"]).to_csv(DATA_FILE, index=False)
 
 @app.route('/ticks', methods=['POST'])
 def receive_tick():
-    tick = request.json
-    print("Received Data:", tick)
-
-    # Convert tick data into DataFrame
-    new_row = pd.DataFrame([{
-        "Datetime": tick["timestamp"],
-        "Open": tick["open"],
-        "High": tick["high"],
-        "Low": tick["low"],
-        "Close": tick["close"],
-        "Tick Volume": tick["volume"]
-    }])
-
-    # Append tick data to CSV file
-    new_row.to_csv(DATA_FILE, mode="a", header=False, index=False)
+    tick = request.get_json(silent=True)
+    if not isinstance(tick, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+
+    try:
+        row = tick_to_row(tick)
+        key = tick_partition(tick)
+    except KeyError as e:
+        return jsonify({"error": f"Missing field {e}"}), 400
+    except (TypeError, ValueError, OverflowError) as e:
+        return jsonify({"error": f"Invalid tick: {e}"}), 400
+
+    partitions.get(*key).ingest((row,))
 
     return jsonify({"message": "Tick received", "tick": tick})
 
+
+@app.route('/ticks/batch', methods=['POST'])
+def receive_tick_batch():
+    payload = request.get_json(silent=True)
+    # Accept either a bare list of ticks or {"ticks": [...]}
+    ticks = payload.get("ticks") if isinstance(payload, dict) else payload
+    if not isinstance(ticks, list):
+        return jsonify({"error": "Expected a JSON array of ticks"}), 400
+
+    # Ticks of several symbols / timeframes may share a batch; each partition gets one write
+    try:
+        count = partitions.ingest(ticks, tick_to_row)
+    except (KeyError, TypeError, AttributeError, ValueError, OverflowError) as e:
+        return jsonify({"error": f"Invalid tick in batch: {e}"}), 400
+    return jsonify({"message": "Ticks received", "count": count})
+
+
+@app.route('/ticks/raw', methods=['POST'])
+def receive_raw_ticks():
+    """Raw bid/ask ticks ({"symbol", "time_msc" or "time", "bid", "ask"}), one or a list, built into bars."""
+    payload = request.get_json(silent=True)
+    ticks = payload.get("ticks", [payload]) if isinstance(payload, dict) else payload
+    if not isinstance(ticks, list):
+        return jsonify({"error": "Expected a JSON tick or array of ticks"}), 400
+
+    try:
+        count = partitions.ingest_raw(ticks)
+    except KeyError as e:
+        return jsonify({"error": f"Missing field {e}"}), 400
+    except (TypeError, AttributeError, ValueError, OverflowError) as e:
+        return jsonify({"error": f"Invalid tick: {e}"}), 400
+    return jsonify({"message": "Ticks received", "count": count})
+
+
+@app.route('/predict', methods=['GET', 'POST'])
+def predict():
+    payload = request.get_json(silent=True) or {}
+    try:
+        steps = int(payload.get("steps", request.args.get("steps", 20)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "steps must be an integer"}), 400
+    if not 1 <= steps <= MAX_PREDICT_STEPS:
+        return jsonify({"error": f"steps must be between 1 and {MAX_PREDICT_STEPS}"}), 400
+
+    try:
+        key = requested_partition(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    partition = partitions.find(*key)
+    if partition is None:
+        return jsonify({"error": f"No ticks received for {key[0]} {key[1]}"}), 404
+
+    try:
+        service = get_forecaster()
+    except (OSError, ValueError) as e:
+        return jsonify({"error": f"Model not available: {e}"}), 503
+
+    seq_length = service.service.seq_length
+    window = partition.recent_window(seq_length)
+    if len(window) < seq_length:
+        return jsonify({"error": f"Need {seq_length} ticks, have {len(window)}"}), 503
+
+    fields = [FEATURE_FIELDS[name] for name in service.service.bundle.features]
+    try:
+        rows = [[float(row[i]) for i in fields] for row in window]
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid tick data: {e}"}), 400
+
+    prices = service.forecast(rows, steps)
+    return jsonify({"symbol": partition.symbol, "timeframe": partition.timeframe,
+                    "last_tick": str(window[-1][0]), "steps": steps, "predictions": prices.tolist()})
+
+
+@app.route('/stream')
+def stream():
+    """Server-Sent Events for ?symbol=&timeframe=: a snapshot of the recent bars, orders and position, then deltas."""
+    try:
+        key = requested_partition()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Only partitions that received ticks have a feed; never create a store for an arbitrary GET
+    partition = partitions.find(*key)
+    if partition is None:
+        return jsonify({"error": f"No ticks received for {key[0]} {key[1]}"}), 404
+    subscription = partition.feed.hub.subscribe()
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(subscription.frames(), mimetype="text/event-stream", headers=headers)
+
+
+@app.route('/partitions')
+def partition_status():
+    return jsonify({"partitions": [partition.status() for partition in partitions],
+                    "aggregators": partitions.aggregator_status()})
+
+
+@app.route('/dashboard')
+def dashboard():
+    return send_from_directory(app.static_folder, "dashboard.html")
+
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # No debug reloader by default: it imports this module twice, opening every partition store twice
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", use_reloader=False, port=5000, threaded=True)
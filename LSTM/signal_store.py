@@ -0,0 +1,157 @@
+"""Compact, de-duplicated store of Buy/Sell crossover signals.
+
+Signals are fixed-size binary records (time, close, side) appended after a
+small header that also holds the high-water mark: the time of the last bar
+that has been examined for signals. SignalEmitter only looks at bars past the
+high-water mark, so each signal is written exactly once no matter how many
+times the same window is re-scanned, and restarts pick up where they left off.
+
+Records are in time order, so lookups by time are binary searches over a
+memory-mapped column.
+
+    python signal_store.py trade_signals.bin --csv trade_signals_log.csv
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"MT5SIGN\x01"
+HEADER_SIZE = 32
+COUNT_OFFSET = 8
+HWM_OFFSET = 16
+NO_HWM = np.iinfo(np.int64).min
+
+BUY, SELL = 1, -1
+RECORD = np.dtype([("time", "<i8"), ("close", "<f8"), ("side", "i1")])
+
+
+def to_ns(dt):
+    """Bar time (Timestamp, datetime64, ISO string or ns int) -> int64 ns."""
+    return pd.Timestamp(dt).value
+
+
+class SignalStore:
+    """Append-only signal records with a persisted high-water mark."""
+
+    def __init__(self, path, mode="a"):
+        self.path = path
+        if mode == "a" and not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(MAGIC + struct.pack("<qq", 0, NO_HWM) + b"\0" * (HEADER_SIZE - 24))
+        self._fd = os.open(path, os.O_RDWR if mode == "a" else os.O_RDONLY)
+        if os.pread(self._fd, len(MAGIC), 0) != MAGIC:
+            os.close(self._fd)
+            raise ValueError(f"{path} is not a signal store")
+
+    def __len__(self):
+        return struct.unpack("<q", os.pread(self._fd, 8, COUNT_OFFSET))[0]
+
+    @property
+    def high_water_mark(self):
+        """Time (ns) of the last bar examined for signals, or None."""
+        hwm = struct.unpack("<q", os.pread(self._fd, 8, HWM_OFFSET))[0]
+        return None if hwm == NO_HWM else hwm
+
+    def append(self, times, closes, sides, high_water_mark):
+        """Append signals and move the high-water mark in one header update."""
+        records = np.empty(len(times), dtype=RECORD)
+        records["time"] = times
+        records["close"] = closes
+        records["side"] = sides
+        count = len(self)
+        if len(records):
+            os.pwrite(self._fd, records.tobytes(), HEADER_SIZE + count * RECORD.itemsize)
+        os.pwrite(self._fd, struct.pack("<qq", count + len(records), high_water_mark), COUNT_OFFSET)
+
+    def records(self):
+        """Memory-mapped view of all records."""
+        count = len(self)
+        if count == 0:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(self.path, dtype=RECORD, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    def between(self, start=None, end=None):
+        """Signals with start <= time < end (bounds are anything pd.Timestamp accepts)."""
+        records = self.records()
+        times = records["time"]
+        lo = 0 if start is None else np.searchsorted(times, to_ns(start), side="left")
+        hi = len(times) if end is None else np.searchsorted(times, to_ns(end), side="left")
+        return records[lo:hi]
+
+    def latest(self, n):
+        records = self.records()
+        return records[max(len(records) - n, 0):]
+
+    def to_frame(self, records=None):
+        """Signals as a DataFrame in the old trade_signals_log.csv layout."""
+        records = self.records() if records is None else records
+        return pd.DataFrame({
+            "Datetime": pd.to_datetime(np.asarray(records["time"]), unit="ns"),
+            "Close": np.asarray(records["close"]),
+            "Buy_Signal": np.asarray(records["side"]) == BUY,
+            "Sell_Signal": np.asarray(records["side"]) == SELL,
+        })
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SignalEmitter:
+    """Emit each Buy/Sell signal once, tracking the last processed bar time."""
+
+    def __init__(self, store):
+        self.store = store
+        hwm = store.high_water_mark
+        self.high_water_mark = NO_HWM if hwm is None else hwm
+
+    def process(self, df):
+        """Emit signals from a window frame (Datetime, Close, Buy_Signal, Sell_Signal).
+
+        Only bars newer than the high-water mark are looked at. Returns the new signals.
+        """
+        times = df["Datetime"].values.astype("datetime64[ns]").view("i8")
+        new = times > self.high_water_mark
+        if not new.any():
+            return df.iloc[:0]
+
+        fresh = df[new]
+        is_signal = (fresh["Buy_Signal"] | fresh["Sell_Signal"]).to_numpy(dtype=bool)
+        signals = fresh[is_signal]
+        self.high_water_mark = int(times[new].max())
+        self.store.append(times[new][is_signal], signals["Close"].values,
+                          np.where(signals["Buy_Signal"].to_numpy(dtype=bool), BUY, SELL), self.high_water_mark)
+        return signals
+
+    def on_bar(self, dt, close, buy_signal, sell_signal):
+        """Emit from a single bar (e.g. as a TradingEngine listener)."""
+        t = to_ns(dt)
+        if t <= self.high_water_mark:
+            return False
+        self.high_water_mark = t
+        if buy_signal or sell_signal:
+            self.store.append([t], [close], [BUY if buy_signal else SELL], t)
+            return True
+        self.store.append([], [], [], t)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export a signal store.")
+    parser.add_argument("store", nargs="?", default="trade_signals.bin")
+    parser.add_argument("--csv", default=None, help="export all signals to this CSV")
+    parser.add_argument("--start", default=None, help="only signals at or after this time")
+    parser.add_argument("--end", default=None, help="only signals before this time")
+    args = parser.parse_args()
+
+    store = SignalStore(args.store, mode="r")
+    frame = store.to_frame(store.between(args.start, args.end))
+    if args.csv:
+        frame.to_csv(args.csv, index=False)
+        print(f"Wrote {len(frame)} signals to {args.csv}")
+    else:
+        print(frame.to_string(index=False))
@@ -0,0 +1,277 @@
+"""Streaming versions of the talib indicators used by the live scripts.
+
+Each indicator keeps its rolling state and updates in O(1) per new bar. The
+arithmetic follows talib's own implementation (same seeding, same running
+sums), so a series fed bar by bar produces the same values talib returns for
+the whole series. Indicators return NaN until they are warmed up, just like
+talib.
+
+Check the outputs against talib on a CSV file with:
+
+    python streaming_indicators.py data/EURUSD_M15.csv
+"""
+import math
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+class SMA:
+    """Simple moving average."""
+
+    def __init__(self, period):
+        self.period = period
+        self._window = deque()
+        self._total = 0.0
+        self.value = NAN
+
+    def update(self, x):
+        self._window.append(x)
+        self._total += x
+        if len(self._window) < self.period:
+            return NAN
+        self.value = self._total / self.period
+        self._total -= self._window.popleft()
+        return self.value
+
+
+class EMA:
+    """Exponential moving average seeded with the SMA of the first `period` values."""
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self._seed = []
+        self.value = NAN
+
+    def seed(self, values):
+        """Start the average from a full window of values (used by MACD)."""
+        total = 0.0
+        for v in values:
+            total += v
+        self.value = total / self.period
+        self._seed = None
+        return self.value
+
+    def update(self, x):
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) < self.period:
+                return NAN
+            return self.seed(self._seed)
+        self.value = ((x - self.value) * self.k) + self.value
+        return self.value
+
+
+class MACD:
+    """MACD line, signal line and histogram.
+
+    Like talib, both EMAs are seeded on the bar where the slow EMA gets its
+    first value, so the fast EMA starts from the SMA of the last `fast` closes.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        if fast > slow:
+            fast, slow = slow, fast
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self._closes = deque(maxlen=slow)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x):
+        if self.slow.value != self.slow.value:  # not seeded yet
+            self._closes.append(x)
+            if len(self._closes) < self.slow.period:
+                return self.value
+            closes = list(self._closes)
+            self.slow.seed(closes)
+            self.fast.seed(closes[-self.fast.period:])
+            self._closes = None
+        else:
+            self.slow.update(x)
+            self.fast.update(x)
+
+        macd = self.fast.value - self.slow.value
+        signal = self.signal.update(macd)
+        if signal == signal:
+            self.value = (macd, signal, macd - signal)
+        return self.value
+
+
+class RSI:
+    """Relative strength index with Wilder smoothing."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._prev = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+        self.value = NAN
+
+    def update(self, x):
+        if self._prev is None:
+            self._prev = x
+            return NAN
+        diff = x - self._prev
+        self._prev = x
+        self._count += 1
+
+        if self._count <= self.period:
+            if diff < 0:
+                self._loss -= diff
+            else:
+                self._gain += diff
+            if self._count < self.period:
+                return NAN
+            self._gain /= self.period
+            self._loss /= self.period
+        else:
+            self._loss *= self.period - 1
+            self._gain *= self.period - 1
+            if diff < 0:
+                self._loss -= diff
+            else:
+                self._gain += diff
+            self._loss /= self.period
+            self._gain /= self.period
+
+        total = self._gain + self._loss
+        self.value = 100.0 * (self._gain / total) if total != 0 else 0.0
+        return self.value
+
+
+class BollingerBands:
+    """Bollinger Bands around an SMA, returned as (upper, middle, lower)."""
+
+    def __init__(self, period=20, nbdevup=2.0, nbdevdn=2.0):
+        self.period = period
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self._sma = SMA(period)
+        self._squares = deque()
+        self._total2 = 0.0
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x):
+        middle = self._sma.update(x)
+        self._squares.append(x * x)
+        self._total2 += x * x
+        if middle != middle:
+            return self.value
+
+        variance = self._total2 / self.period - middle * middle
+        self._total2 -= self._squares.popleft()
+        stddev = math.sqrt(variance) if variance >= 1e-14 else 0.0
+        self.value = (middle + stddev * self.nbdevup, middle, middle - stddev * self.nbdevdn)
+        return self.value
+
+
+class LiveIndicators:
+    """The indicator set used by live_plot.py / live_trade.py, updated bar by bar.
+
+    Keeps the last `window` bars (with their indicator values) for plotting.
+    The column names follow the default periods; `sma_period`/`ema_period`
+    change the slow SMA ("SMA_50") and the EMA ("EMA_10") used for signals.
+    """
+
+    COLUMNS = ["Datetime", "Close", "SMA_10", "SMA_50", "EMA_10",
+               "MACD", "MACD_Signal", "MACD_Hist", "Distance_SMA50_EMA10"]
+
+    def __init__(self, window=500, sma_period=50, ema_period=10):
+        self.sma_10 = SMA(10)
+        self.sma_50 = SMA(sma_period)
+        self.ema_10 = EMA(ema_period)
+        self.macd = MACD(12, 26, 9)
+        self.bars = 0
+        self.rows = deque(maxlen=window)
+
+    def update(self, dt, close):
+        """Add one bar; a close that is not a finite number raises ValueError / TypeError and changes nothing."""
+        close = float(close)
+        if not math.isfinite(close):
+            raise ValueError(f"close must be a finite number, got {close!r}")
+        sma_10 = self.sma_10.update(close)
+        sma_50 = self.sma_50.update(close)
+        ema_10 = self.ema_10.update(close)
+        macd, signal, hist = self.macd.update(close)
+        row = (dt, close, sma_10, sma_50, ema_10, macd, signal, hist, -(sma_50 - ema_10))
+        self.rows.append(row)
+        self.bars += 1
+        return row
+
+    def update_many(self, datetimes, closes):
+        for dt, close in zip(datetimes, closes):
+            self.update(dt, close)
+
+    def frame(self):
+        """Return the kept bars as a DataFrame indexed by bar number."""
+        df = pd.DataFrame(list(self.rows), columns=self.COLUMNS,
+                          index=pd.RangeIndex(self.bars - len(self.rows), self.bars))
+        df["Datetime"] = pd.to_datetime(df["Datetime"])
+        return df
+
+
+def _stream(indicator, values):
+    out = [indicator.update(v) for v in values]
+    return np.array(out, dtype=float)
+
+
+def verify_against_talib(close, rtol=1e-9, atol=1e-12):
+    """Run every streaming indicator over `close` and compare with talib.
+
+    Returns {name: max abs difference} and raises AssertionError on mismatch.
+    """
+    import talib
+
+    close = np.asarray(close, dtype=float)
+    expected = {
+        "SMA_10": talib.SMA(close, timeperiod=10),
+        "SMA_50": talib.SMA(close, timeperiod=50),
+        "EMA_10": talib.EMA(close, timeperiod=10),
+        "EMA_200": talib.EMA(close, timeperiod=200),
+        "RSI": talib.RSI(close, timeperiod=14),
+    }
+    expected.update(zip(("MACD", "MACD_Signal", "MACD_Hist"), talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)))
+    expected.update(zip(("Upper_Band", "Middle_Band", "Lower_Band"), talib.BBANDS(close, timeperiod=20)))
+
+    actual = {
+        "SMA_10": _stream(SMA(10), close),
+        "SMA_50": _stream(SMA(50), close),
+        "EMA_10": _stream(EMA(10), close),
+        "EMA_200": _stream(EMA(200), close),
+        "RSI": _stream(RSI(14), close),
+    }
+    actual.update(zip(("MACD", "MACD_Signal", "MACD_Hist"), _stream(MACD(12, 26, 9), close).T))
+    actual.update(zip(("Upper_Band", "Middle_Band", "Lower_Band"), _stream(BollingerBands(20), close).T))
+
+    errors = {}
+    for name, exp in expected.items():
+        act = actual[name]
+        if not np.array_equal(np.isnan(exp), np.isnan(act)):
+            raise AssertionError(f"{name}: warm-up period differs from talib")
+        errors[name] = float(np.nanmax(np.abs(act - exp))) if np.isfinite(exp).any() else 0.0
+        if not np.allclose(act, exp, rtol=rtol, atol=atol, equal_nan=True):
+            raise AssertionError(f"{name}: max abs difference {errors[name]:.3e} exceeds tolerance")
+    return errors
+
+
+if __name__ == "__main__":
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "data/EURUSD_M15.csv"
+    close = pd.read_csv(csv_file)["Close"].to_numpy(dtype=float)
+
+    for name, err in verify_against_talib(close).items():
+        print(f"{name:12s} max abs diff vs talib: {err:.3e}")
+
+    live = LiveIndicators()
+    start = time.perf_counter()
+    for c in close:
+        live.update(None, c)
+    elapsed = time.perf_counter() - start
+    print(f"LiveIndicators: {len(close)} bars, {elapsed / len(close) * 1e6:.2f} us per bar")
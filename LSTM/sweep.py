@@ -0,0 +1,191 @@
+"""Parallel parameter sweep for the SMA/EMA pyramiding strategy.
+
+Backtests are fanned out over a process pool. The price history is placed in
+shared memory once and every worker maps it, so tasks only carry parameter
+dicts. Results are appended to a CSV as chunks finish; re-running the same
+command skips combinations that are already in the file.
+
+Grid over explicit values:
+
+    python sweep.py data/EURUSD_M15.csv --param sma_period=20,50,100 --param pips_gain_for_increase=50,100,200
+
+Latin-hypercube (or random) samples over ranges:
+
+    python sweep.py data/EURUSD_M15.csv --sample lhs --samples 5000 \\
+        --param sma_period=20:200 --param ema_period=5:30 --param pips_gain_for_increase=20:400
+"""
+import argparse
+import functools
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import crossover_signals, equity_curve, load_bars, simulate, summarize, trade_table
+from trading_engine import StrategyConfig
+
+PARAMETERS = ("initial_lot_size", "lot_multiplier", "pips_gain_for_increase", "sma_period", "ema_period")
+INT_PARAMETERS = ("sma_period", "ema_period")
+
+# Set in every worker by _attach()
+_close = None
+_times = None
+_shm = []
+
+# Crossover signals kept per worker: two bool arrays as long as the history per
+# (sma, ema) pair. Tasks arrive sorted by those periods, so a few recent pairs are enough
+SIGNAL_CACHE_SIZE = 8
+
+
+def parse_param(text):
+    """'name=1,2,3' -> (name, [1, 2, 3]); 'name=lo:hi' -> (name, (lo, hi))."""
+    name, _, spec = text.partition("=")
+    if name not in PARAMETERS:
+        raise argparse.ArgumentTypeError(f"unknown parameter {name!r}, choose from {', '.join(PARAMETERS)}")
+    cast = int if name in INT_PARAMETERS else float
+    if ":" in spec:
+        low, high = spec.split(":")
+        return name, (cast(low), cast(high))
+    return name, [cast(v) for v in spec.split(",")]
+
+
+def grid(params):
+    """Every combination of the listed values."""
+    names = list(params)
+    for name in names:
+        if isinstance(params[name], tuple):
+            raise ValueError(f"{name}: ranges need --sample random or --sample lhs")
+    return [dict(zip(names, values)) for values in itertools.product(*(params[n] for n in names))]
+
+
+def sample(params, count, method="lhs", seed=0):
+    """Random or Latin-hypercube samples; value lists are sampled uniformly."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in params.items():
+        if method == "lhs":
+            # One point per stratum, strata shuffled independently per dimension
+            u = (rng.permutation(count) + rng.random(count)) / count
+        else:
+            u = rng.random(count)
+        if isinstance(spec, tuple):
+            low, high = spec
+            if name in INT_PARAMETERS:
+                columns[name] = np.floor(low + u * (high - low + 1)).astype(int).clip(low, high).tolist()
+            else:
+                columns[name] = (low + u * (high - low)).tolist()
+        else:
+            columns[name] = [spec[i] for i in np.minimum((u * len(spec)).astype(int), len(spec) - 1)]
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def param_key(params):
+    return ";".join(f"{name}={params[name]!r}" for name in sorted(params))
+
+
+def _attach(close_name, times_name, length):
+    """Pool initializer: map the shared price arrays into this worker."""
+    global _close, _times
+    close_shm = shared_memory.SharedMemory(name=close_name)
+    times_shm = shared_memory.SharedMemory(name=times_name)
+    _shm.extend([close_shm, times_shm])  # keep the mappings alive
+    _close = np.ndarray((length,), dtype=np.float64, buffer=close_shm.buf)
+    _times = np.ndarray((length,), dtype="datetime64[ns]", buffer=times_shm.buf)
+
+
+@functools.lru_cache(maxsize=SIGNAL_CACHE_SIZE)
+def _signals(sma_period, ema_period):
+    return crossover_signals(_close, sma_period, ema_period)
+
+
+def _run_chunk(chunk):
+    rows = []
+    for params in chunk:
+        config = StrategyConfig(**params)
+        buy, sell = _signals(config.sma_period, config.ema_period)
+
+        start = time.perf_counter()
+        orders = simulate(_close, buy, sell, config)
+        trades = trade_table(*orders, _times, _close)
+        equity = equity_curve(_close, *orders[:4])
+        stats = summarize(trades, equity)
+        stats["seconds"] = time.perf_counter() - start
+        rows.append({"key": param_key(params), **params, **stats})
+    return rows
+
+
+def run_sweep(times, close, combos, out_file, workers=None, chunk_size=16):
+    """Backtest every parameter combination not already present in `out_file`."""
+    done = set()
+    if os.path.exists(out_file):
+        done = set(pd.read_csv(out_file, usecols=["key"])["key"])
+    todo = [p for p in combos if param_key(p) not in done]
+    print(f"{len(combos)} combinations, {len(combos) - len(todo)} already done, {len(todo)} to run")
+    if not todo:
+        return pd.read_csv(out_file)
+
+    # Group equal indicator periods together so workers reuse cached signals
+    todo.sort(key=lambda p: (p.get("sma_period", 50), p.get("ema_period", 10)))
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    times = np.ascontiguousarray(times, dtype="datetime64[ns]")
+    close_shm = shared_memory.SharedMemory(create=True, size=close.nbytes)
+    times_shm = shared_memory.SharedMemory(create=True, size=times.nbytes)
+    try:
+        np.ndarray(close.shape, dtype=close.dtype, buffer=close_shm.buf)[:] = close
+        np.ndarray(times.shape, dtype=times.dtype, buffer=times_shm.buf)[:] = times
+
+        start = time.perf_counter()
+        finished = 0
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(close_shm.name, times_shm.name, len(close))) as pool:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                rows = pd.DataFrame(future.result())
+                # Append as we go so an interrupted sweep can resume
+                rows.to_csv(out_file, mode="a", header=not os.path.exists(out_file), index=False)
+                finished += len(rows)
+                elapsed = time.perf_counter() - start
+                print(f"\r{finished}/{len(todo)} done, {finished / elapsed:,.1f} backtests/s", end="", flush=True)
+        print()
+    finally:
+        close_shm.close()
+        close_shm.unlink()
+        times_shm.close()
+        times_shm.unlink()
+
+    return pd.read_csv(out_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over a process pool.")
+    parser.add_argument("csv", nargs="?", default="data/EURUSD_M15.csv")
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        help="name=v1,v2,... (values) or name=low:high (range, needs --sample)")
+    parser.add_argument("--sample", choices=["grid", "random", "lhs"], default="grid")
+    parser.add_argument("--samples", type=int, default=1000, help="number of random/LHS samples")
+    parser.add_argument("--seed", type=int, default=0, help="sampling seed (keep it fixed to resume)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default="sweep_results.csv", help="results CSV (appended, used to resume)")
+    parser.add_argument("--rank-by", default="net_profit", help="column to rank the results by")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    params = dict(args.param)
+    if not params:
+        parser.error("give at least one --param")
+    combos = grid(params) if args.sample == "grid" else sample(params, args.samples, args.sample, args.seed)
+
+    times, close = load_bars(args.csv)
+    results = run_sweep(times, close, combos, args.out, workers=args.workers)
+
+    ranked = results.sort_values(args.rank_by, ascending=False).reset_index(drop=True)
+    ranked_file = os.path.splitext(args.out)[0] + "_ranked.csv"
+    ranked.to_csv(ranked_file, index_label="rank")
+    print(ranked.drop(columns=["key"]).head(args.top).to_string())
+    print(f"Ranked results written to {ranked_file}")
@@ -1,49 +1,176 @@
+import argparse
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+from market_data import load_columns
 
-# API Endpoint (replace with your actual API URL)
+# API Endpoints (replace with your actual API URL)
 API_URL = "http://127.0.0.1:5000/ticks"
+BATCH_API_URL = "http://127.0.0.1:5000/ticks/batch"
+
+# CSV File to replay
+CSV_FILE = "data/EURUSD_M15.csv"  # Adjust path if needed
+
+
+def load_ticks(csv_file, symbol=None, timeframe=None):
+    """Load the CSV and build the tick payloads in one vectorized pass.
+
+    `symbol` / `timeframe` tag every tick with its partition on the server
+    (which assumes EURUSD M15 when they are left out).
+    """
+    bars = load_columns(csv_file)
+    datetimes = bars["Datetime"]
 
-# Load CSV File
-csv_file = "data/EURUSD_M15.csv"  # Adjust path if needed
-df = pd.read_csv(csv_file)
+    payload = pd.DataFrame({
+        "timestamp": np.datetime_as_string(datetimes, unit="s"),
+        "open": bars["Open"],
+        "high": bars["High"],
+        "low": bars["Low"],
+        "close": bars["Close"],
+        "volume": bars["Tick Volume"],
+    })
+    if symbol is not None:
+        payload["symbol"] = symbol
+    if timeframe is not None:
+        payload["timeframe"] = timeframe
+    return datetimes.view("i8"), payload.to_dict("records")
 
-# Rename columns to match expected format
-df.columns = ['Date', 'Time', 'Open', 'High', 'Low', 'Close', 'Tick Volume']
 
-# Combine Date & Time into a single datetime column
-df['Datetime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'])
+class ReplayStats:
+    """Thread-safe counters and latency samples for the final report."""
 
-# Select only required columns
-df = df[['Datetime', 'Open', 'High', 'Low', 'Close', 'Tick Volume']]
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies_ms = []
+        self.ticks = 0
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.max_lag_ms = 0.0
 
-# Stream data row by row
-def stream_tick_data():
-    for _, row in df.iterrows():
-        tick_data = {
-            "timestamp": row["Datetime"].isoformat(),
-            "open": row["Open"],
-            "high": row["High"],
-            "low": row["Low"],
-            "close": row["Close"],
-            "volume": row["Tick Volume"]
-        }
+    def record(self, ticks, latency_ms, ok, throttled=0):
+        with self.lock:
+            self.requests += 1
+            self.throttled += throttled
+            self.latencies_ms.append(latency_ms)
+            if ok:
+                self.ticks += ticks
+            else:
+                self.errors += 1
 
-        print(tick_data)
+    def report(self, elapsed):
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        print("Replay finished")
+        print(f"  Ticks sent:     {self.ticks} in {self.requests} requests ({self.errors} errors)")
+        print(f"  Throttled:      {self.throttled} responses 429 (retried after Retry-After)")
+        print(f"  Elapsed:        {elapsed:.2f} s")
+        print(f"  Throughput:     {self.ticks / elapsed:,.0f} ticks/s, {self.requests / elapsed:,.0f} requests/s")
+        print(f"  Latency (ms):   p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  max {latencies.max():.2f}")
+        print(f"  Max send lag:   {self.max_lag_ms:.1f} ms behind schedule")
 
-        # Send data to API
-        response = requests.post(API_URL, json=tick_data)
 
-        # Print status
-        if response.status_code == 200:
-            print(f"✅ Sent: {tick_data}")
-        else:
-            print(f"❌ Error {response.status_code}: {response.text}")
+def stream_tick_data(times, ticks, speed=None, interval=0.3, concurrency=1, batch_size=1, verbose=False,
+                     max_retries=5):
+    """Replay ticks against the server.
+
+    speed:    1 = real time, N = N times faster, 0 = as fast as possible.
+              When None, ticks are sent every `interval` seconds (the old behaviour).
+    batch_size > 1 posts lists of ticks to the batch endpoint; that is the way to
+              more throughput. concurrency > 1 sends requests in parallel, so
+              bars can reach the server out of order, which breaks the
+              indicators and the strategy; use it only for load tests.
+    A 429 from a server under backpressure (async_server.py) is retried up to
+    `max_retries` times, after the Retry-After it asks for.
+    """
+    stats = ReplayStats()
+    local = threading.local()
+
+    def session():
+        # One keep-alive session per worker thread
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            local.session.mount("http://", adapter)
+            local.session.mount("https://", adapter)
+        return local.session
+
+    def send(batch):
+        start = time.perf_counter()
+        throttled = 0
+        ok = False
+        try:
+            while True:
+                if batch_size > 1:
+                    response = session().post(BATCH_API_URL, json=batch)
+                else:
+                    response = session().post(API_URL, json=batch[0])
+                if response.status_code != 429 or throttled == max_retries:
+                    break
+                throttled += 1
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+            # 202: queued by async_server.py
+            ok = response.status_code in (200, 202)
+            if not ok and verbose:
+                print(f"❌ Error {response.status_code}: {response.text}")
+        except requests.RequestException as e:
+            if verbose:
+                print(f"❌ Error: {e}")
+        finally:
+            # Any other error (e.g. a bad Retry-After) must still free the slot, or the replay stalls
+            stats.record(len(batch), (time.perf_counter() - start) * 1000, ok, throttled)
+            in_flight.release()
+
+    # Keep at most two batches per worker queued so the schedule stays honest
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(0, len(ticks), batch_size):
+            if speed is None:
+                due = (i // batch_size) * interval
+            elif speed > 0:
+                due = (times[i] - times[0]) / 1e9 / speed
+            if speed != 0:
+                wait = due - (time.perf_counter() - wall_start)
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    stats.max_lag_ms = max(stats.max_lag_ms, -wait * 1000)
+
+            in_flight.acquire()
+            pool.submit(send, ticks[i:i + batch_size])
+
+    stats.report(time.perf_counter() - wall_start)
+    return stats
 
-        time.sleep(0.3)  # Wait 1 second before sending the next row
 
 # Run the stream
 if __name__ == "__main__":
-    stream_tick_data()
+    parser = argparse.ArgumentParser(description="Replay historical bars against the tick server.")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file to replay")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="1 = real time, N = N times faster, 0 = as fast as possible")
+    parser.add_argument("--interval", type=float, default=0.3,
+                        help="seconds between sends when --speed is not given")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="parallel keep-alive connections; > 1 reorders bars on the server, "
+                             "so only use it for load tests (use --batch-size for throughput)")
+    parser.add_argument("--batch-size", type=int, default=1, help="ticks per request (uses /ticks/batch when > 1)")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N rows")
+    parser.add_argument("--symbol", default=None, help="symbol to tag the ticks with (server default: EURUSD)")
+    parser.add_argument("--timeframe", default=None, help="timeframe to tag the ticks with (server default: M15)")
+    parser.add_argument("--verbose", action="store_true", help="print failed requests")
+    args = parser.parse_args()
+
+    times, ticks = load_ticks(args.csv, args.symbol, args.timeframe)
+    if args.limit:
+        times, ticks = times[:args.limit], ticks[:args.limit]
+    print(f"Replaying {len(ticks)} ticks from {args.csv}")
+    stream_tick_data(times, ticks, speed=args.speed, interval=args.interval, concurrency=args.concurrency,
+                     batch_size=args.batch_size, verbose=args.verbose)
@@ -0,0 +1,198 @@
+"""Append-only columnar tick store.
+
+A store is a directory holding one raw little-endian file per column plus a
+small header with the committed row count:
+
+    realtime_ticks.store/
+        header.bin          magic (8 bytes) + row count (int64)
+        Datetime.i8         int64 nanoseconds since the epoch
+        Open.f8 ... Close.f8
+        Tick Volume.i8
+
+Writers append to every column file and then bump the row count, so readers
+never see a partially written row. Readers memory-map only the rows they ask
+for, which keeps `tail(n)` O(n) no matter how large the store grows.
+
+Convert an existing CSV with:
+
+    python tick_store.py realtime_ticks.csv realtime_ticks.store
+"""
+import os
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"MT5TICK\x01"
+HEADER_FILE = "header.bin"
+HEADER_SIZE = 16
+ROW_COUNT_OFFSET = 8
+
+# Column name -> dtype, in tick order (matches tick_writer.TICK_COLUMNS)
+COLUMNS = {
+    "Datetime": np.dtype("<i8"),
+    "Open": np.dtype("<f8"),
+    "High": np.dtype("<f8"),
+    "Low": np.dtype("<f8"),
+    "Close": np.dtype("<f8"),
+    "Tick Volume": np.dtype("<i8"),
+}
+
+
+def _column_file(name, dtype):
+    return f"{name}.{dtype.kind}{dtype.itemsize}"
+
+
+def to_datetime_ns(values):
+    """Convert timestamps (ISO strings, datetime64 or ns integers) to int64 ns."""
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return arr.astype("<i8", copy=False)
+    if arr.dtype.kind != "M":
+        # Per-element parsing: one batch may mix "2024.01.02 10:00" and ISO strings of different precision
+        arr = pd.to_datetime(arr, format="mixed").values
+    return arr.astype("datetime64[ns]").view("<i8")
+
+
+class TickStore:
+    """Columnar tick store opened for reading ("r") or appending ("a")."""
+
+    def __init__(self, path, mode="r"):
+        if mode not in ("r", "a"):
+            raise ValueError(f"mode must be 'r' or 'a', got {mode!r}")
+        self.path = path
+        self.mode = mode
+        header_path = os.path.join(path, HEADER_FILE)
+
+        if mode == "a" and not os.path.exists(header_path):
+            os.makedirs(path, exist_ok=True)
+            with open(header_path, "wb") as f:
+                f.write(MAGIC + struct.pack("<q", 0))
+
+        self._header_fd = os.open(header_path, os.O_RDWR if mode == "a" else os.O_RDONLY)
+        if os.pread(self._header_fd, len(MAGIC), 0) != MAGIC:
+            os.close(self._header_fd)
+            raise ValueError(f"{path} is not a tick store")
+
+        self._column_paths = {name: os.path.join(path, _column_file(name, dtype)) for name, dtype in COLUMNS.items()}
+        self._column_files = {}
+        if mode == "a":
+            rows = len(self)
+            for name, dtype in COLUMNS.items():
+                f = open(self._column_paths[name], "ab")
+                # Drop any bytes from an append that never got committed to the header
+                f.truncate(rows * dtype.itemsize)
+                self._column_files[name] = f
+
+    def __len__(self):
+        return struct.unpack("<q", os.pread(self._header_fd, 8, ROW_COUNT_OFFSET))[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------ writing
+
+    def append_columns(self, columns):
+        """Append whole columns (a mapping of column name -> array-like)."""
+        if self.mode != "a":
+            raise IOError("store was opened read-only")
+        arrays = {}
+        for name, dtype in COLUMNS.items():
+            values = to_datetime_ns(columns[name]) if name == "Datetime" else columns[name]
+            arrays[name] = np.ascontiguousarray(values, dtype=dtype)
+        count = len(arrays["Datetime"])
+        if any(len(a) != count for a in arrays.values()):
+            raise ValueError("all columns must have the same length")
+        if count == 0:
+            return 0
+
+        committed = len(self)
+        try:
+            for name, arr in arrays.items():
+                f = self._column_files[name]
+                f.write(arr.tobytes())
+                f.flush()
+        except Exception:
+            # Cut every column back to the committed rows so a retry starts from a clean tail
+            for name, f in self._column_files.items():
+                f.truncate(committed * COLUMNS[name].itemsize)
+            raise
+        # Committing the new row count makes the rows visible to readers
+        os.pwrite(self._header_fd, struct.pack("<q", len(self) + count), ROW_COUNT_OFFSET)
+        return count
+
+    def append(self, rows):
+        """Append rows ordered like COLUMNS (Datetime, Open, High, Low, Close, Tick Volume)."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        transposed = list(zip(*rows))
+        return self.append_columns(dict(zip(COLUMNS, transposed)))
+
+    def fsync(self):
+        for f in self._column_files.values():
+            os.fsync(f.fileno())
+        os.fsync(self._header_fd)
+
+    def close(self):
+        for f in self._column_files.values():
+            f.close()
+        self._column_files = {}
+        if self._header_fd is not None:
+            os.close(self._header_fd)
+            self._header_fd = None
+
+    # ------------------------------------------------------------------ reading
+
+    def read(self, start=0, stop=None):
+        """Return read-only NumPy views of rows [start, stop) for every column."""
+        rows = len(self)
+        start, stop, _ = slice(start, stop).indices(rows)
+        count = max(stop - start, 0)
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            if count == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(self._column_paths[name], dtype=dtype, mode="r",
+                                          offset=start * dtype.itemsize, shape=(count,))
+        return columns
+
+    def tail(self, n):
+        """Return views of the last `n` rows."""
+        rows = len(self)
+        return self.read(max(rows - n, 0), rows)
+
+    def tail_frame(self, n):
+        """Return the last `n` rows as a DataFrame indexed by row number."""
+        rows = len(self)
+        start = max(rows - n, 0)
+        columns = self.read(start, rows)
+        df = pd.DataFrame({name: np.array(values) for name, values in columns.items()},
+                          index=pd.RangeIndex(start, rows))
+        df["Datetime"] = pd.to_datetime(df["Datetime"], unit="ns")
+        return df
+
+
+def csv_to_store(csv_path, store_path, chunksize=500_000):
+    """Convert a tick CSV (Datetime or Date+Time columns) into a TickStore."""
+    total = 0
+    with TickStore(store_path, mode="a") as store:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            if "Datetime" not in chunk.columns:
+                chunk["Datetime"] = chunk["Date"] + " " + chunk["Time"]
+            chunk = chunk.rename(columns={"Tick volume": "Tick Volume"})
+            total += store.append_columns({name: chunk[name].values for name in COLUMNS})
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python tick_store.py <input.csv> <output.store>")
+        sys.exit(1)
+    count = csv_to_store(sys.argv[1], sys.argv[2])
+    print(f"Wrote {count} rows to {sys.argv[2]}")
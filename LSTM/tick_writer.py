@@ -0,0 +1,241 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TICK_COLUMNS = ["Datetime", "Open", "High", "Low", "Close", "Tick Volume"]
+INT64_MAX = 2**63 - 1
+
+# When to call os.fsync after a flush:
+#   "never"    - leave it to the OS (fastest, may lose the last few seconds on power loss)
+#   "flush"    - after every flush (safest, slowest)
+#   "interval" - at most once every `fsync_interval` seconds
+FSYNC_POLICIES = ("never", "flush", "interval")
+
+
+def parse_timestamp(value):
+    """Tick timestamp string (ISO 8601 or MT5's "2024.01.02 10:00:00") -> numpy datetime64[ns].
+
+    Times with a UTC offset are converted to UTC. Raises ValueError / TypeError, also
+    for times outside the datetime64[ns] range.
+    """
+    if not isinstance(value, str):
+        raise TypeError(f"timestamp must be a string, got {value!r}")
+    ts = pd.Timestamp(value)
+    if ts is pd.NaT:
+        raise ValueError(f"timestamp is empty: {value!r}")
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    try:
+        return np.datetime64(ts.value, "ns")
+    except (OverflowError, pd.errors.OutOfBoundsDatetime) as e:
+        # The store keeps ns since the epoch: 1677-09-21 to 2262-04-11
+        raise ValueError(f"timestamp {value!r} is out of range") from e
+
+
+def _price(value):
+    price = float(value)
+    if not math.isfinite(price):
+        raise ValueError(f"price must be a finite number, got {value!r}")
+    return price
+
+
+def _volume(value):
+    """Tick volume as an int that fits the store's int64 column; raises ValueError / TypeError."""
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"volume must be a finite number, got {value!r}")
+    volume = int(value)
+    if not 0 <= volume <= INT64_MAX:
+        raise ValueError(f"volume must be between 0 and {INT64_MAX}, got {volume}")
+    return volume
+
+
+def tick_to_row(tick):
+    """Convert an incoming tick payload into a row ordered like TICK_COLUMNS.
+
+    The timestamp is parsed, prices are converted to float and the volume to
+    int here, before anything is buffered, so a malformed tick raises KeyError /
+    TypeError / ValueError (a 400 for the client) instead of reaching the
+    writer or the strategy, or failing a whole flush later.
+    """
+    return (
+        parse_timestamp(tick["timestamp"]),
+        _price(tick["open"]),
+        _price(tick["high"]),
+        _price(tick["low"]),
+        _price(tick["close"]),
+        _volume(tick["volume"]),
+    )
+
+
+class CsvTickSink:
+    """Append rows to a plain CSV file (the original realtime_ticks.csv format)."""
+
+    def __init__(self, path):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        if new_file:
+            self._file.write(",".join(TICK_COLUMNS) + "\n")
+            self._file.flush()
+
+    def append(self, rows):
+        self._file.write("".join(",".join(map(str, row)) + "\n" for row in rows))
+        self._file.flush()
+        return len(rows)
+
+    def fsync(self):
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class BufferedTickWriter:
+    """Buffer ticks in memory and append them to a sink in batches.
+
+    The sink is anything with `append(rows)`, `fsync()` and `close()`, e.g. a
+    CsvTickSink or a tick_store.TickStore opened in append mode. Rows are
+    flushed by a background thread when `flush_rows` rows are pending or
+    `flush_interval` seconds have passed, whichever comes first.
+
+    Accepted rows are never thrown away. When the sink fails, the batch goes
+    back to the front of the buffer and is retried on the next flush; after
+    `max_attempts` failures in a row it is appended to the `dead_letter` CSV
+    instead (when one is given) so the writer can move on.
+    """
+
+    def __init__(self, sink, flush_rows=5000, flush_interval=0.5, fsync="never", fsync_interval=1.0,
+                 dead_letter=None, max_attempts=3):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.sink = sink
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.dead_letter = dead_letter
+        self.max_attempts = max_attempts
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._last_fsync = time.monotonic()
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self._failures = 0
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tick-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def write(self, row):
+        """Queue a single row."""
+        with self._buffer_lock:
+            self._buffer.append(row)
+            pending = len(self._buffer)
+        if pending >= self.flush_rows:
+            self._wake.set()
+
+    def write_many(self, rows):
+        """Queue several rows at once."""
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            pending = len(self._buffer)
+        if pending >= self.flush_rows:
+            self._wake.set()
+
+    def pending(self):
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """Write all buffered rows to disk."""
+        with self._buffer_lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+
+        with self._io_lock:
+            try:
+                self.sink.append(rows)
+            except Exception:
+                self.failed_flushes += 1
+                self._failures += 1
+                if self.dead_letter is not None and self._failures >= self.max_attempts:
+                    self._write_dead_letter(rows)
+                    self._failures = 0
+                    return 0
+                # Keep the rows, ahead of anything that arrived meanwhile, for the next flush
+                with self._buffer_lock:
+                    self._buffer[:0] = rows
+                raise
+            self._failures = 0
+            self._maybe_fsync()
+            self.rows_written += len(rows)
+            self.flushes += 1
+        return len(rows)
+
+    def _write_dead_letter(self, rows):
+        sink = CsvTickSink(self.dead_letter)
+        try:
+            sink.append(rows)
+            sink.fsync()
+        finally:
+            sink.close()
+        self.dead_lettered += len(rows)
+        print(f"Tick writer moved {len(rows)} rows to {self.dead_letter} after {self.max_attempts} failed flushes")
+
+    def _maybe_fsync(self):
+        if self.fsync == "flush":
+            self.sink.fsync()
+        elif self.fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                self.sink.fsync()
+                self._last_fsync = now
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the writer alive; the failed rows stay buffered and are retried
+                print(f"Tick writer flush failed, will retry: {e}")
+
+    def close(self):
+        """Stop the flush thread, write what is left and close the sink."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Give a failing sink the same retries (and dead letter) as the flush thread did
+        for attempt in range(self.max_attempts):
+            try:
+                self.flush()
+                break
+            except Exception:
+                if attempt == self.max_attempts - 1:
+                    raise
+        with self._io_lock:
+            if not self._closed:
+                if self.fsync != "never":
+                    self.sink.fsync()
+                self.sink.close()
+                self._closed = True
@@ -0,0 +1,274 @@
+"""Headless, event-driven version of the SMA50/EMA10 strategy from live_trade.py.
+
+The engine reacts to every bar as soon as it is handed over, either directly
+through `on_bar` or through its queue (`submit` + `start`). All strategy state
+lives on the engine object; viewers such as live_trade.py only read
+`snapshot()`.
+
+Run it without a display, following the tick store written by server.py:
+
+    python trading_engine.py --symbol EURUSD --timeframe M15
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from streaming_indicators import LiveIndicators
+
+# What submit() does when the engine's queue is full:
+#   "block"       - wait for the engine to catch up (backpressure on the caller)
+#   "drop_oldest" - discard the oldest queued bar to make room, counted in `dropped`
+OVERFLOW_POLICIES = ("block", "drop_oldest")
+
+
+class StrategyConfig:
+    """Parameters of the SMA/EMA crossover strategy with pyramiding."""
+
+    def __init__(self, initial_lot_size=0.01, lot_multiplier=2, pips_gain_for_increase=100,
+                 sma_period=50, ema_period=10, pip_factor=100000):
+        self.initial_lot_size = initial_lot_size
+        # Each add-on trades `lot_multiplier` times the current lot size
+        self.lot_multiplier = lot_multiplier
+        self.pips_gain_for_increase = pips_gain_for_increase
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+        # Price difference -> pips, as in live_trade.py
+        self.pip_factor = pip_factor
+
+
+def print_order(order):
+    """Default broker: print the order like the original execute_trade/close_trade."""
+    # Orders from a partitioned server (see partitions.py) say which stream they belong to
+    prefix = f"{order['symbol']} {order['timeframe']}: " if "symbol" in order else ""
+    if order["action"] == "close":
+        print(f"{prefix}Closing all positions. {'Long' if order['side'] == 'buy' else 'Short'} Lot Size: {order['lot']}")
+    else:
+        print(f"{prefix}Executing trade at {order['lot']} lots. {'Buy' if order['side'] == 'buy' else 'Sell'} x_pos: {order['bar']}")
+
+
+class TradingEngine:
+    """SMA/EMA crossover strategy that decides on every incoming bar."""
+
+    def __init__(self, config=None, broker=print_order, window=500, max_queue=100_000, overflow="block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.config = config or StrategyConfig()
+        self.broker = broker
+        self.indicators = LiveIndicators(window, sma_period=self.config.sma_period, ema_period=self.config.ema_period)
+
+        # Strategy state (formerly module globals in live_trade.py)
+        self.entry_price = 0
+        self.current_lot_size = self.config.initial_lot_size
+        self.total_trade_lot = 0
+        self.position_open = False
+        self.is_position_long = None  # True for long, False for short
+        self.buy_position = deque(maxlen=window)
+        self._prev_distance = float("nan")
+
+        self.orders = deque(maxlen=1000)
+        self.order_latencies_us = deque(maxlen=10000)
+        # Called with (bar_index, row, buy_signal, sell_signal) after every bar
+        self.listeners = []
+
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(max_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.errors = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def bars(self):
+        return self.indicators.bars
+
+    # ------------------------------------------------------------------ events
+
+    def on_bar(self, dt, close):
+        """Process one bar: update indicators, detect crossovers, place orders."""
+        received = time.perf_counter_ns()
+        with self.lock:
+            row = self.indicators.update(dt, close)
+            bar = self.indicators.bars - 1
+            distance = row[-1]
+            buy_signal = self._prev_distance < 0 and distance > 0
+            sell_signal = self._prev_distance > 0 and distance < 0
+            self._prev_distance = distance
+            self._decide(bar, dt, close, buy_signal, sell_signal, received)
+
+        for listener in self.listeners:
+            listener(bar, row, buy_signal, sell_signal)
+        return buy_signal, sell_signal
+
+    def warm_up(self, datetimes, closes):
+        """Feed historical bars into the indicators without trading on them."""
+        with self.lock:
+            for dt, close in zip(datetimes, closes):
+                self._prev_distance = self.indicators.update(dt, close)[-1]
+
+    def _decide(self, bar, dt, close, buy_signal, sell_signal, received):
+        config = self.config
+        if buy_signal and not self.position_open:
+            self._execute_trade("open", config.initial_lot_size, True, bar, dt, close, received)
+            self.entry_price = close
+            self.position_open = True
+            self.is_position_long = True
+            self.current_lot_size = config.initial_lot_size
+
+        if self.position_open:
+            if (self.is_position_long and sell_signal) or (not self.is_position_long and buy_signal):
+                self._close_trade(bar, dt, close, received)
+
+        diff_in_pips = (close - self.entry_price) * config.pip_factor
+        # Add to the position each time price moves `pips_gain_for_increase` in our favour
+        if self.position_open and diff_in_pips >= config.pips_gain_for_increase:
+            new_lot = self.current_lot_size * config.lot_multiplier
+            self._execute_trade("add", new_lot, self.is_position_long, bar, dt, close, received)
+            self.current_lot_size += new_lot
+            self.entry_price = close
+
+    def _send(self, order, received):
+        self.orders.append(order)
+        if self.broker is not None:
+            self.broker(order)
+        self.order_latencies_us.append((time.perf_counter_ns() - received) / 1000)
+
+    def _execute_trade(self, action, lot_size, is_buy, bar, dt, close, received):
+        self.total_trade_lot += lot_size
+        self.buy_position.append(bar)
+        self._send({"action": action, "side": "buy" if is_buy else "sell", "lot": lot_size, "price": close,
+                    "bar": bar, "time": dt, "total_lot": self.total_trade_lot}, received)
+
+    def _close_trade(self, bar, dt, close, received):
+        self._send({"action": "close", "side": "buy" if self.is_position_long else "sell",
+                    "lot": self.total_trade_lot, "price": close, "bar": bar, "time": dt,
+                    "total_lot": 0}, received)
+        self.position_open = False
+        self.entry_price = 0
+        self.current_lot_size = self.config.initial_lot_size
+        self.total_trade_lot = 0
+
+    # ------------------------------------------------------------------ queue
+
+    def submit(self, dt, close):
+        """Hand a bar to the engine thread without waiting for the decision (unless the queue is full)."""
+        if self.overflow == "block":
+            self.queue.put((dt, close))
+            return
+        while True:
+            try:
+                self.queue.put_nowait((dt, close))
+                return
+            except queue.Full:
+                try:
+                    if self.queue.get_nowait() is not None:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def start(self):
+        """Start a thread that processes submitted bars as they arrive."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trading-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            try:
+                self.on_bar(*item)
+            except Exception as e:
+                # Keep the engine alive; the bad bar is skipped
+                self.errors += 1
+                print(f"Trading engine skipped bar {item!r}: {e}")
+            # The None sentinel may have been dropped from a full queue: the event still ends the loop
+            if self._stopping.is_set() and self.queue.empty():
+                break
+
+    def stop(self):
+        """Process the bars already queued, then end the engine thread."""
+        if self._thread is not None:
+            self._stopping.set()
+            try:
+                # Wakes the thread if it is waiting on an empty queue; a full queue needs no wake-up
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self._thread.join()
+            self._thread = None
+            self._stopping.clear()
+
+    # ------------------------------------------------------------------ viewers
+
+    def snapshot(self):
+        """Copy of the state a viewer needs: recent bars, signals and positions."""
+        with self.lock:
+            df = self.indicators.frame()
+            state = {
+                "position_open": self.position_open,
+                "is_position_long": self.is_position_long,
+                "entry_price": self.entry_price,
+                "current_lot_size": self.current_lot_size,
+                "total_trade_lot": self.total_trade_lot,
+                "buy_position": list(self.buy_position),
+                "orders": list(self.orders),
+            }
+        distance = df["Distance_SMA50_EMA10"]
+        df["Buy_Signal"] = (distance.shift(1) < 0) & (distance > 0)
+        df["Sell_Signal"] = (distance.shift(1) > 0) & (distance < 0)
+        state["frame"] = df
+        return state
+
+    def latency_stats(self):
+        """Signal-to-order latency percentiles in microseconds."""
+        if not self.order_latencies_us:
+            return {}
+        values = np.array(self.order_latencies_us)
+        return {"orders": len(values), "p50_us": float(np.percentile(values, 50)),
+                "p99_us": float(np.percentile(values, 99)), "max_us": float(values.max())}
+
+
+def follow_store(store, engine, poll_interval=0.005, stop_event=None, trade_history=False):
+    """Feed every new row of a TickStore into the engine as soon as it is committed.
+
+    Rows already in the store only warm up the indicators unless `trade_history` is set.
+    """
+    if not trade_history and len(store) > engine.bars:
+        history = store.read(engine.bars, len(store))
+        engine.warm_up(history["Datetime"].tolist(), history["Close"].tolist())
+    while stop_event is None or not stop_event.is_set():
+        rows = len(store)
+        if rows > engine.bars:
+            new_bars = store.read(engine.bars, rows)
+            for dt, close in zip(new_bars["Datetime"].tolist(), new_bars["Close"].tolist()):
+                engine.on_bar(dt, close)
+        else:
+            time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from partitions import DEFAULT_SYMBOL, DEFAULT_TIMEFRAME, partition_key, store_path, strategy_config
+    from tick_store import TickStore
+
+    parser = argparse.ArgumentParser(description="Run the strategy headless on one symbol/timeframe's ticks.")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
+    args = parser.parse_args()
+    symbol, timeframe = partition_key(args.symbol, args.timeframe)
+
+    engine = TradingEngine(strategy_config(symbol))
+    path = store_path(symbol, timeframe)
+    print(f"Following {path} (Ctrl+C to stop)")
+    try:
+        follow_store(TickStore(path), engine)
+    except KeyboardInterrupt:
+        pass
+    print("Signal-to-order latency:", engine.latency_stats())
@@ -1,11 +1,21 @@
+import argparse
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
 from sklearn.preprocessing import MinMaxScaler
+from windowing import make_dataset, make_streaming_dataset
+from market_data import iter_features, load_frame
+from lstm_model import build_model
+from model_bundle import BUNDLE_PATH, file_fingerprint, save_bundle
+
+parser = argparse.ArgumentParser(description="Train the LSTM trend model.")
+parser.add_argument("--csv", default="data/EURUSD_M15.csv")
+parser.add_argument("--stream", action="store_true",
+                    help="stream the cached columns in chunks instead of loading them (for histories larger than RAM)")
+parser.add_argument("--chunksize", type=int, default=200_000, help="rows per chunk with --stream")
+parser.add_argument("--bundle", default=BUNDLE_PATH, help="model bundle directory to write")
+args = parser.parse_args()
 
 print("Num GPUs Available:", len(tf.config.experimental.list_physical_devices('GPU')))
 
@@ -20,70 +30,68 @@ if gpus:
     except RuntimeError as e:
         print(e)
 
-# Load dataset
-df = pd.read_csv("data/EURUSD_M15.csv")
-
-# Convert Date and Time into a datetime format
-df['Datetime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'])
-df.set_index('Datetime', inplace=True)
-
-# Drop unnecessary columns
-df.drop(columns=['Date', 'Time'], inplace=True)
+# Define sequence length (lookback window)
+seq_length = 50
+batch_size = 32
 
-# Use 'Close' and 'Tick volume' as input features
-data = df[['Close', 'Tick volume']].copy()
+# Use 'Close' and 'Tick Volume' as input features
+features = ['Close', 'Tick Volume']
 
 # Normalize data with separate scalers
 scaler_close = MinMaxScaler(feature_range=(0, 1))
 scaler_volume = MinMaxScaler(feature_range=(0, 1))
 
-scaler_close.fit(data[['Close']])
-scaler_volume.fit(data[['Tick volume']])
-
-data_scaled = np.hstack((
-    scaler_close.transform(data[['Close']]),
-    scaler_volume.transform(data[['Tick volume']])
-))
-
-# Function to create sequences for LSTM input
-def create_sequences(data, seq_length=50):
-    X, y = [], []
-    for i in range(len(data) - seq_length):
-        X.append(data[i:i+seq_length])
-        y.append(data[i+seq_length, 0])  # Predicting Close price only
-    return np.array(X), np.array(y)
-
-# Define sequence length (lookback window)
-seq_length = 50
-
-# Create sequences
-X, y = create_sequences(data_scaled, seq_length)
-
-# Train-test split (Manual, to maintain time order)
-split_index = int(len(X) * 0.8)
-X_train, X_test = X[:split_index], X[split_index:]
-y_train, y_test = y[:split_index], y[split_index:]
-
-# Build LSTM model
-model = Sequential([
-    LSTM(50, return_sequences=True, input_shape=(seq_length, 2)),
-    Dropout(0.2),
-    LSTM(50, return_sequences=False),
-    Dropout(0.2),
-    Dense(25, activation='relu'),
-    Dense(1)
-])
-
-# Compile the model
-model.compile(optimizer='adam', loss='mean_squared_error')
+def scale(data):
+    return np.hstack((
+        scaler_close.transform(data[:, [0]]),
+        scaler_volume.transform(data[:, [1]])
+    )).astype(np.float32)
+
+if args.stream:
+    # Fit the scalers in one pass over the cached columns, then stream windows chunk by chunk
+    rows = 0
+    for chunk in iter_features(args.csv, features, args.chunksize):
+        scaler_close.partial_fit(chunk[:, [0]])
+        scaler_volume.partial_fit(chunk[:, [1]])
+        rows += len(chunk)
+
+    def scaled_chunks(start_row, stop_row):
+        for chunk in iter_features(args.csv, features, args.chunksize, start_row, stop_row):
+            yield scale(chunk)
+
+    # Train-test split (Manual, to maintain time order)
+    split_row = int((rows - seq_length) * 0.8) + seq_length
+    train_ds = make_streaming_dataset(lambda: scaled_chunks(0, split_row), seq_length, len(features), batch_size)
+    test_ds = make_streaming_dataset(lambda: scaled_chunks(split_row - seq_length, None), seq_length, len(features),
+                                     batch_size, shuffle_buffer=0)
+else:
+    # Load dataset, indexed by Datetime
+    df = load_frame(args.csv, index=True)
+
+    data = df[features].to_numpy(dtype=np.float64)
+    scaler_close.fit(data[:, [0]])
+    scaler_volume.fit(data[:, [1]])
+    data_scaled = scale(data)
+
+    # Windows are gathered per batch from data_scaled instead of being copied into X
+    # Train-test split (Manual, to maintain time order)
+    split_index = int((len(data_scaled) - seq_length) * 0.8)
+    train_ds = make_dataset(data_scaled, seq_length, batch_size, stop=split_index, shuffle=True)
+    test_ds = make_dataset(data_scaled, seq_length, batch_size, start=split_index)
+
+# Build and compile the LSTM model
+model = build_model(seq_length, len(features))
 
 # Train with EarlyStopping
 early_stopping = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
-history = model.fit(X_train, y_train, epochs=5, batch_size=32, validation_data=(X_test, y_test), callbacks=[early_stopping])
+history = model.fit(train_ds, epochs=5, validation_data=test_ds, callbacks=[early_stopping])
 
-# Save trained model
-model.save("lstm_trend_model.h5")
-print("Model saved successfully!")
+# Save trained model together with its scalers and feature schema
+save_bundle(args.bundle, model, features, seq_length,
+            data_min=[scaler_close.data_min_[0], scaler_volume.data_min_[0]],
+            data_max=[scaler_close.data_max_[0], scaler_volume.data_max_[0]],
+            fingerprint=file_fingerprint(args.csv))
+print(f"Model saved successfully to {args.bundle}!")
 
 # Plot training loss
 plt.figure(figsize=(12, 6))
@@ -98,7 +106,8 @@ plt.show()
 # --------- PREDICTIONS & ACTUAL PRICE PLOT ---------
 
 # Make predictions
-y_pred = model.predict(X_test)
+y_pred = model.predict(test_ds)
+y_test = np.concatenate([y.numpy() for _, y in test_ds])
 
 # Convert predictions and actual values back to original scale (Close Price only)
 y_pred_actual = scaler_close.inverse_transform(y_pred)
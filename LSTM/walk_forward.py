@@ -0,0 +1,181 @@
+"""Walk-forward evaluation of the LSTM trend model.
+
+The history is cut into successive folds; each fold trains a fresh model on
+its training span (scalers fitted on that span only) and scores one-step-ahead
+forecasts on the bars that immediately follow it:
+
+    rolling:    [train 0 ][test 0]
+                        [train 1 ][test 1]
+    expanding:  [train 0 ][test 0]
+                [train 1         ][test 1]
+
+Folds run in parallel worker processes. Each worker caps TensorFlow / BLAS to
+`--threads` threads so that workers x threads matches the core count instead
+of every process trying to use every core. The feature array is shared with
+the workers through shared memory, as in sweep.py.
+
+    python walk_forward.py data/EURUSD_M15.csv --folds 8 --test-size 5000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from market_data import load_columns
+from model_bundle import FeatureScaler
+from windowing import make_dataset
+
+FEATURES = ['Close', 'Tick Volume']
+
+# Set in every worker by _init_worker()
+_data = None
+_shm = []
+
+
+def make_folds(n_rows, folds, test_size, train_size=None, mode="rolling"):
+    """(train_start, train_end, test_end) row bounds for each fold, oldest first.
+
+    The test spans are the last `folds * test_size` rows. Without `train_size`,
+    the first fold trains on everything before its test span.
+    """
+    first_test = n_rows - folds * test_size
+    if train_size is None:
+        train_size = first_test
+    if first_test < train_size or train_size <= 0 or test_size <= 0:
+        raise ValueError(f"{n_rows} rows are too few for {folds} folds of {train_size} + {test_size} rows")
+    bounds = []
+    for k in range(folds):
+        train_end = first_test + k * test_size
+        train_start = train_end - train_size if mode == "rolling" else first_test - train_size
+        bounds.append((train_start, train_end, train_end + test_size))
+    return bounds
+
+
+def _init_worker(shm_name, shape, threads):
+    """Pool initializer: cap threads before TensorFlow is imported, then map the shared data."""
+    global _data
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shm.append(shm)  # keep the mapping alive
+    _data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _run_fold(fold, bounds, seq_length, epochs, batch_size, seed):
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+    from lstm_model import build_model
+
+    start = time.perf_counter()
+    train_start, train_end, test_end = bounds
+    tf.keras.utils.set_random_seed(seed + fold)
+
+    scaler = FeatureScaler.fit(_data[train_start:train_end])
+    train = scaler.transform(_data[train_start:train_end])
+    # Test windows reach back seq_length rows into the training span for context
+    test = scaler.transform(_data[train_end - seq_length:test_end])
+
+    # The last 10% of the training windows are held out for early stopping
+    n_windows = len(train) - seq_length
+    split = int(n_windows * 0.9)
+    train_ds = make_dataset(train, seq_length, batch_size, stop=split, shuffle=True, seed=seed)
+    val_ds = make_dataset(train, seq_length, batch_size, start=split)
+    test_ds = make_dataset(test, seq_length, batch_size)
+
+    model = build_model(seq_length, train.shape[1])
+    early_stopping = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
+    history = model.fit(train_ds, epochs=epochs, validation_data=val_ds, callbacks=[early_stopping], verbose=0)
+    fit_seconds = time.perf_counter() - start
+
+    predicted = scaler.inverse_column(model.predict(test_ds, verbose=0)[:, 0])
+    actual = _data[train_end:test_end, 0]
+    previous = _data[train_end - 1:test_end - 1, 0]
+    moved = actual != previous
+    return {
+        "fold": fold,
+        "train_start": train_start,
+        "train_end": train_end,
+        "test_end": test_end,
+        "epochs": len(history.history["loss"]),
+        "rmse": float(np.sqrt(np.mean((predicted - actual) ** 2))),
+        # Persistence forecast (next close = last close), the baseline to beat
+        "naive_rmse": float(np.sqrt(np.mean((previous - actual) ** 2))),
+        "directional_accuracy": float(np.mean(np.sign(predicted - previous)[moved] == np.sign(actual - previous)[moved])),
+        "fit_seconds": fit_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def walk_forward(data, folds, seq_length=50, epochs=5, batch_size=32, workers=None, threads=None, seed=0,
+                 on_result=None):
+    """Train and score every fold in a process pool; returns one metrics row per fold."""
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    workers = workers or min(len(folds), os.cpu_count())
+    threads = threads or max(os.cpu_count() // workers, 1)
+
+    shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)[:] = data
+        results = []
+        # spawn, so every worker starts without TensorFlow state inherited from the parent
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(shm.name, data.shape, threads)) as pool:
+            futures = [pool.submit(_run_fold, k, bounds, seq_length, epochs, batch_size, seed)
+                       for k, bounds in enumerate(folds)]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if on_result:
+                    on_result(results[-1])
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(results).sort_values("fold").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward evaluation of the LSTM model.")
+    parser.add_argument("csv", nargs="?", default="data/EURUSD_M15.csv")
+    parser.add_argument("--mode", choices=["rolling", "expanding"], default="rolling")
+    parser.add_argument("--folds", type=int, default=8)
+    parser.add_argument("--test-size", type=int, default=5000, help="bars scored per fold")
+    parser.add_argument("--train-size", type=int, default=None,
+                        help="bars trained on per fold (initial size when expanding; default: all earlier bars)")
+    parser.add_argument("--seq-length", type=int, default=50)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None, help="parallel folds (default: one per fold, up to the core count)")
+    parser.add_argument("--threads", type=int, default=None, help="threads per worker (default: cores / workers)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="walk_forward_results.csv")
+    args = parser.parse_args()
+
+    bars = load_columns(args.csv)
+    data = np.column_stack([bars[name] for name in FEATURES]).astype(np.float64)
+    folds = make_folds(len(data), args.folds, args.test_size, args.train_size, args.mode)
+    print(f"{len(data)} bars, {len(folds)} {args.mode} folds of {folds[0][1] - folds[0][0]} train / {args.test_size} test bars")
+
+    def report(row):
+        print(f"fold {row['fold']}: rmse {row['rmse']:.6f} (naive {row['naive_rmse']:.6f}), "
+              f"direction {row['directional_accuracy']:.1%}, {row['epochs']} epochs, {row['seconds']:.1f} s")
+
+    start = time.perf_counter()
+    results = walk_forward(data, folds, args.seq_length, args.epochs, args.batch_size, args.workers, args.threads,
+                           args.seed, on_result=report)
+    elapsed = time.perf_counter() - start
+    results.to_csv(args.out, index=False)
+
+    print(results.drop(columns=["train_start", "train_end", "test_end"]).to_string(index=False))
+    print(f"mean rmse {results['rmse'].mean():.6f}, mean direction {results['directional_accuracy'].mean():.1%}")
+    print(f"{len(results)} folds in {elapsed:.1f} s wall-clock ({results['seconds'].sum():.1f} s of fold time)")
+    print(f"Results written to {args.out}")
@@ -0,0 +1,88 @@
+"""Sliding-window helpers for the LSTM scripts.
+
+Windows are NumPy strided views or are gathered on the fly inside a tf.data
+pipeline, so the (samples, seq_length, features) tensor is never built in
+memory. For histories that do not fit in RAM, `make_streaming_dataset` reads
+the data in chunks and carries the last `seq_length` rows over between chunks.
+"""
+import numpy as np
+
+
+def sliding_windows(data, seq_length):
+    """All windows of `seq_length` consecutive rows as a read-only view.
+
+    Shape is (len(data) - seq_length + 1, seq_length, n_features); no data is copied.
+    """
+    data = np.asarray(data)
+    return np.lib.stride_tricks.sliding_window_view(data, seq_length, axis=0).transpose(0, 2, 1)
+
+
+def training_windows(data, seq_length, target_column=0):
+    """(X, y) where X[i] = data[i:i+seq_length] and y[i] = data[i+seq_length, target_column].
+
+    Same pairs as the old create_sequences(), but X is a view instead of a copy.
+    """
+    data = np.asarray(data)
+    return sliding_windows(data[:-1], seq_length), data[seq_length:, target_column]
+
+
+def last_window(data, seq_length):
+    """The most recent window, shaped (1, seq_length, n_features) for model input."""
+    return np.asarray(data)[-seq_length:][np.newaxis]
+
+
+def make_dataset(data, seq_length, batch_size=32, start=0, stop=None, shuffle=False, seed=None,
+                 target_column=0):
+    """tf.data pipeline over windows [start, stop) of an in-memory array.
+
+    Only window start indices are shuffled and batched; each batch is gathered
+    from a single copy of `data`, then prefetched while the model trains.
+    """
+    import tensorflow as tf
+
+    data = np.asarray(data, dtype=np.float32)
+    n_windows = len(data) - seq_length
+    stop = n_windows if stop is None else min(stop, n_windows)
+
+    source = tf.constant(data)
+    targets = tf.constant(data[:, target_column])
+    offsets = tf.range(seq_length, dtype=tf.int64)[tf.newaxis, :]
+
+    def gather(starts):
+        return tf.gather(source, starts[:, tf.newaxis] + offsets), tf.gather(targets, starts + seq_length)
+
+    ds = tf.data.Dataset.range(start, stop)
+    if shuffle:
+        ds = ds.shuffle(stop - start, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def iter_windows(chunks, seq_length, target_column=0):
+    """Yield (X, y) batches of windows from consecutive chunks, carrying rows across chunk edges."""
+    carry = None
+    for chunk in chunks:
+        data = chunk if carry is None else np.concatenate([carry, chunk])
+        if len(data) > seq_length:
+            x, y = training_windows(data, seq_length, target_column)
+            yield np.ascontiguousarray(x), y
+        carry = data[-seq_length:]
+
+
+def make_streaming_dataset(chunk_source, seq_length, n_features, batch_size=32, shuffle_buffer=10_000,
+                           seed=None, target_column=0):
+    """tf.data pipeline over data read from disk chunk by chunk.
+
+    `chunk_source` is a zero-argument callable returning a fresh iterator of
+    (already scaled) feature chunks, so each epoch re-reads the file. Samples
+    are shuffled within a bounded buffer, so memory stays flat whatever the file size.
+    """
+    import tensorflow as tf
+
+    signature = (tf.TensorSpec((None, seq_length, n_features), tf.float32), tf.TensorSpec((None,), tf.float32))
+    ds = tf.data.Dataset.from_generator(lambda: iter_windows(chunk_source(), seq_length, target_column),
+                                        output_signature=signature)
+    ds = ds.unbatch()
+    if shuffle_buffer:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,37 @@
+import os
+import sys
+# Repository root, for the shared mt5report package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import streamlit as st
+from mt5report.batch import analyze_batch
+
+from utils import setup_sidebar
+setup_sidebar(logo_path="logo/logo.png")
+
+# Page content
+st.title("Batch Report Analysis")
+
+uploaded_files = st.file_uploader("Upload HTML Reports or Zip Archives", type=["html", "htm", "zip"],
+                                  accept_multiple_files=True)
+if uploaded_files:
+    with st.spinner(f"Analyzing {len(uploaded_files)} uploads..."):
+        # Reports are parsed in parallel worker processes, each served from the cache when seen before
+        batch = analyze_batch([(f.name, f.getvalue()) for f in uploaded_files])
+
+    failed = [r for r in batch.reports if r.error]
+    st.write(f"{len(batch.reports) - len(failed)} of {len(batch.reports)} reports analyzed in {batch.seconds:.2f} s")
+    for report in failed:
+        st.warning(f"{report.name}: {report.error}")
+
+    st.subheader("Comparison")
+    st.dataframe(batch.table)
+
+    if batch.combined is not None:
+        st.subheader("All Reports Combined")
+        st.markdown(batch.combined.to_text(newline="  \n"))
+
+        st.subheader("All Reports per Symbol and Volume")
+        st.dataframe(batch.combined.groups)
+
+        st.subheader("Profit per Report")
+        st.bar_chart(batch.table.dropna(subset=["Profit"]).set_index("Report")[["Profit"]])
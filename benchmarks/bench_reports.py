@@ -0,0 +1,142 @@
+"""Parse and analysis benchmarks for mt5report on synthetic reports.
+
+For each report size the report is generated once into benchmarks/data/, then
+parsing (mt5report.parse_report) and deal analysis (mt5report.analyze_deals)
+are timed separately, best of --repeat runs, and their peak Python memory is
+measured in a separate tracemalloc run (tracing slows the code down, so it is
+kept out of the timings).
+
+    python benchmarks/bench_reports.py                      # 1k, 100k and 1M deals
+    python benchmarks/bench_reports.py --sizes 1k,100k --save benchmarks/results.jsonl
+    python benchmarks/bench_reports.py --sizes 100k --baseline benchmarks/results.jsonl
+
+--save appends one JSON line per size; --baseline compares against the last
+saved line for each size and exits with status 1 when a metric got slower or
+bigger than --tolerance allows.
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mt5report import analyze_deals, parse_report  # noqa: E402
+from synthetic import write_report  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+METRICS = ["parse_seconds", "analyze_seconds", "parse_peak_mb", "analyze_peak_mb"]
+
+
+def parse_size(text):
+    """'1k' -> 1000, '1M' -> 1000000."""
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1].lower(), 1)
+    return int(float(text.rstrip("kKmM")) * multiplier)
+
+
+def report_path(n_deals):
+    path = os.path.join(DATA_DIR, f"report_{n_deals}.html")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        start = time.perf_counter()
+        write_report(path + ".tmp", n_deals)
+        os.replace(path + ".tmp", path)
+        print(f"generated {path} in {time.perf_counter() - start:.1f} s")
+    return path
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_mb(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run(n_deals, repeat):
+    path = report_path(n_deals)
+    row = {
+        "deals": n_deals,
+        "file_mb": round(os.path.getsize(path) / 2**20, 1),
+        "parse_seconds": round(best_time(lambda: parse_report(path), repeat), 4),
+        "parse_peak_mb": round(peak_mb(lambda: parse_report(path)), 1),
+    }
+    # Only the deals are kept for the analysis runs, so two parsed reports never coexist
+    deals = parse_report(path).deals
+    row["analyze_seconds"] = round(best_time(lambda: analyze_deals(deals), repeat), 4)
+    row["analyze_peak_mb"] = round(peak_mb(lambda: analyze_deals(deals)), 1)
+    return row
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_baseline(path):
+    """Last saved result for each report size."""
+    baseline = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                baseline[row["deals"]] = row
+    return baseline
+
+
+def regressions(row, baseline, tolerance):
+    old = baseline.get(row["deals"])
+    if old is None:
+        return []
+    return [f"{row['deals']} deals: {metric} {old[metric]} -> {row[metric]}"
+            for metric in METRICS if metric in old and row[metric] > old[metric] * (1 + tolerance)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MT5 report parsing and analysis.")
+    parser.add_argument("--sizes", default="1k,100k,1M", help="comma-separated deal counts, e.g. 1k,100k,1M")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the best one counts)")
+    parser.add_argument("--save", default=None, help="append results as JSON lines to this file")
+    parser.add_argument("--baseline", default=None, help="JSON lines file of earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / growth, as a fraction")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    revision = git_revision()
+    failed = []
+    print(f"{'deals':>9} {'file MB':>8} {'parse s':>9} {'analyze s':>10} {'parse MB':>9} {'analyze MB':>11}")
+    for size in args.sizes.split(","):
+        row = run(parse_size(size), args.repeat)
+        print(f"{row['deals']:>9} {row['file_mb']:>8} {row['parse_seconds']:>9.3f} {row['analyze_seconds']:>10.3f} "
+              f"{row['parse_peak_mb']:>9.1f} {row['analyze_peak_mb']:>11.1f}")
+        failed += regressions(row, baseline, args.tolerance)
+        if args.save:
+            row.update(revision=revision, created=time.strftime("%Y-%m-%dT%H:%M:%S"), python=sys.version.split()[0])
+            with open(args.save, "a") as f:
+                f.write(json.dumps(row) + "\n")
+
+    if failed:
+        print("Regressions against the baseline:")
+        print("\n".join(f"  {line}" for line in failed))
+        sys.exit(1)
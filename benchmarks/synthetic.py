@@ -0,0 +1,90 @@
+"""Synthetic MT5 strategy tester reports for benchmarking.
+
+The generated file follows the layout MT5 writes (UTF-16 with BOM, a Results
+table, then Orders and Deals tables) with a deterministic mix of symbols,
+volumes and profits, including thousands separators, an opening balance row,
+deals without a comment and the trailing totals row. Rows are written as they
+are generated, so a million-deal report needs no more memory than a small one.
+
+    python benchmarks/synthetic.py 100000 benchmarks/data/report_100k.html
+"""
+import argparse
+import random
+
+SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"]
+VOLUMES = ["0.01", "0.02", "0.10", "0.50", "1.00"]
+ORDER_COLUMNS = ["Open Time", "Order", "Symbol", "Type", "Volume", "Price", "S / L", "T / P", "Time", "State",
+                 "Comment"]
+DEAL_COLUMNS = ["Time", "Deal", "Symbol", "Type", "Direction", "Volume", "Price", "Order", "Commission", "Swap",
+                "Profit", "Balance", "Comment"]
+
+
+def _money(value):
+    # MT5 separates thousands with a space
+    return f"{value:,.2f}".replace(",", " ")
+
+
+def _header(columns):
+    return "<tr bgcolor=\"#E5F0FC\">" + "".join(f"<td nowrap><b>{c}</b></td>" for c in columns) + "</tr>\n"
+
+
+def _section(title):
+    return f"<tr align=center><th colspan=13 style=\"height: 25px\"><div><b>{title}</b></div></th></tr>\n"
+
+
+def write_report(path, n_deals, seed=0, encoding="utf-16"):
+    """Write a report with `n_deals` deals (half opening, half closing trades) to `path`."""
+    rnd = random.Random(seed)
+    n_trades = n_deals // 2
+    balance = 10000.0
+    with open(path, "w", encoding=encoding, newline="\r\n") as f:
+        f.write("<!DOCTYPE html>\n<html>\n<head>\n<title>Strategy Tester Report: Synthetic</title>\n</head>\n"
+                "<body>\n<div align=center>\n<table cellspacing=1 cellpadding=3 border=0 width=820>\n")
+        f.write("<tr><th colspan=13><div style=\"font: 14pt\"><b>Strategy Tester Report</b></div></th></tr>\n")
+        f.write("<tr align=left><td colspan=3>Expert:</td><td colspan=10><b>Synthetic</b></td></tr>\n")
+        f.write(_section("Results"))
+        f.write("<tr align=left><td nowrap colspan=3>History Quality:</td><td nowrap><b>100%</b></td>"
+                f"<td nowrap colspan=3>Bars:</td><td nowrap><b>{n_deals}</b></td></tr>\n")
+        f.write("<tr align=left><td nowrap colspan=3>Initial Deposit:</td><td nowrap><b>10 000.00</b></td>"
+                f"<td nowrap colspan=3>Total Trades:</td><td nowrap><b>{n_trades}</b></td></tr>\n")
+        f.write("</table>\n<table cellspacing=1 cellpadding=3 border=0 width=820>\n")
+
+        f.write(_section("Orders"))
+        f.write(_header(ORDER_COLUMNS))
+        for i in range(n_deals):
+            symbol = SYMBOLS[i // 2 % len(SYMBOLS)]
+            f.write(f"<tr bgcolor=\"#F7F7F7\" align=right><td>2024.01.02 {i // 60 % 24:02d}:{i % 60:02d}:00</td>"
+                    f"<td>{i + 2}</td><td>{symbol}</td><td>{'buy' if i % 2 == 0 else 'sell'}</td>"
+                    f"<td>0.01 / 0.01</td><td>1.10{i % 100:02d}</td><td></td><td></td>"
+                    f"<td>2024.01.02 00:00:00</td><td>filled</td><td></td></tr>\n")
+
+        f.write(_section("Deals"))
+        f.write(_header(DEAL_COLUMNS))
+        f.write("<tr bgcolor=\"#FFFFFF\" align=right><td>2024.01.01 00:00:00</td><td>1</td><td></td>"
+                "<td>balance</td><td></td><td></td><td></td><td></td><td>0.00</td><td>0.00</td>"
+                f"<td>{_money(balance)}</td><td>{_money(balance)}</td><td></td></tr>\n")
+        for i in range(n_trades):
+            symbol = rnd.choice(SYMBOLS)
+            volume = rnd.choice(VOLUMES)
+            profit = round(rnd.gauss(1.0, 20.0) * float(volume) * 100, 2)
+            comment = "" if rnd.random() < 0.05 else "EA"
+            for direction, deal_profit in (("in", 0.0), ("out", profit)):
+                balance += deal_profit
+                deal = 2 * i + (direction == "out") + 2
+                f.write(f"<tr bgcolor=\"#F7F7F7\" align=right><td>2024.01.02 00:00:00</td><td>{deal}</td>"
+                        f"<td>{symbol}</td><td>{'buy' if direction == 'in' else 'sell'}</td><td>{direction}</td>"
+                        f"<td>{volume}</td><td>1.10{deal % 100:02d}</td><td>{deal}</td><td>0.00</td><td>0.00</td>"
+                        f"<td>{_money(deal_profit)}</td><td>{_money(balance)}</td><td>{comment}</td></tr>\n")
+        f.write("<tr align=right><td colspan=8></td><td>0.00</td><td>0.00</td>"
+                f"<td>{_money(balance - 10000.0)}</td><td>{_money(balance)}</td></tr>\n")
+        f.write("</table>\n</div>\n</body>\n</html>\n")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic MT5 report.")
+    parser.add_argument("deals", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_report(args.path, args.deals, args.seed)
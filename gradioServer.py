@@ -1,88 +1,36 @@
 import gradio as gr
-from bs4 import BeautifulSoup
-import chardet
-from analyze_deals import analyze_deals
+from analyze_deals import png_image
+from mt5report.analysis import analyze_html as analyze_cached
+from mt5report.batch import analyze_batch
+from mt5report.render import win_rate_chart
 
 def analyze_html(file_path):
     try:
-        # Read file in binary mode to detect encoding
-        with open(file_path, "rb") as f:
-            raw_data = f.read()
-            detected_encoding = chardet.detect(raw_data)["encoding"]
-        
-        if not detected_encoding:
-            return "Error: Unable to detect file encoding."
-        
-        # Read the file using detected encoding
-        with open(file_path, "r", encoding=detected_encoding, errors="replace") as f:
-            html_content = f.read()
-
-        # Parse HTML content
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        # Extract title
-        title = soup.title.string.strip() if soup.title else "No title found"
-
-        # Extract headings (h1 to h6)
-        headings = {f"h{i}": [h.get_text(strip=True) for h in soup.find_all(f"h{i}")] for i in range(1, 7)}
-
-        # Extract links
-        links = [a["href"] for a in soup.find_all("a", href=True)]
+        # Parsing and statistics come from mt5report (cached by report content)
+        analysis = analyze_cached(file_path)
+        report = analysis.report
+        if analysis.deals is None:
+            yield analysis.to_text(), [], report.orders, report.deals, None
+            return
 
-        # Extract tables
-        tables = soup.find_all('table')
+        # The chart renders in a worker process; show the text and tables first
+        chart = win_rate_chart(file_path, analysis.deals.groups)
+        yield analysis.to_text(), report.results, report.orders, report.deals, None
+        yield gr.update(), gr.update(), gr.update(), gr.update(), png_image(chart.result())
 
-        summary = []
-        orders = []
-        deals = []
-        for idx, table in enumerate(tables, 1):
-            rows = []
-            foundStartPoint = False
-            isOrders = False
-            isDeals = False
-            for row in table.find_all('tr'):
-                columns = [col.get_text(strip=True) for col in row.find_all(['th','td'])]
-                columns = [col for col in columns if col != '']
-                if idx == 1: 
-                    if foundStartPoint:
-                        for i in range(0, len(columns), 2):
-                            if i + 1 < len(columns):
-                                col_data = [columns[i], columns[i + 1]]
-                                rows.append(col_data)
-                            else:
-                                col_data = [columns[i]]
-                    elif columns and columns[0] == "Results":  # Ensure 'Results' is the first column if present
-                        foundStartPoint = True
-                else:
-                    if columns and columns[0] == "Orders":
-                        isOrders = True
-                        isDeals = False
-                        continue
-                    elif columns and columns[0] == "Deals":
-                        isOrders = False
-                        isDeals = True
-                        continue
-                    if isOrders: 
-                        orders.append(columns)
-                    elif isDeals:
-                        deals.append(columns)
-            
-            if rows:  # Only append if there's data in rows
-                summary.append(rows)
-
-        # Prepare the result
-        result = f"**Title:** {title}\n\n"
-        for h_level, h_texts in headings.items():
-            if h_texts:
-                result += f"**{h_level.upper()} Headings:** {', '.join(h_texts)}\n\n"
-        if summary and len(summary) > 0:
-            deal_result, plot_bytes = analyze_deals(deals)
-            return result + deal_result, summary[0], orders, deals, plot_bytes
+    except Exception as e:
+        yield f"Error processing file: {str(e)}", [], [], [], None
 
-        return result, [], orders, deals , ""
+def analyze_batch_files(files):
+    try:
+        # Uploads arrive as temp file paths (or wrappers with .name); reports are parsed in parallel processes
+        paths = [getattr(f, "name", f) for f in files or []]
+        batch = analyze_batch(paths)
+        groups = batch.combined.groups if batch.combined is not None else None
+        return batch.to_text(), batch.table, groups
 
     except Exception as e:
-        return f"Error processing file: {str(e)}"
+        return f"Error processing files: {str(e)}", None, None
 
 def main():
     with gr.Blocks() as demo:
@@ -114,13 +62,29 @@ def main():
             
             html_analyze_btn.click(analyze_html, inputs=[html_file_input], outputs=[html_output, summary, orders, deals, plot_output])
 
-        with gr.Tab("HTML File Analyzer"):
-            gr.Markdown("# HTML Analysis & Data Display")
-            gr.Markdown("# HTML Analysis & Data Display")
-            gr.Markdown("# HTML Analysis & Data Display")
-            gr.Markdown("# HTML Analysis & Data Display")
+        with gr.Tab("Batch Analyzer"):
+            with gr.Row():
+                with gr.Column(scale=1):
+                    batch_files_input = gr.File(label="Upload HTML Reports or Zip Archives", file_count="multiple",
+                                                file_types=[".html", ".htm", ".zip"])
+                    batch_analyze_btn = gr.Button("Analyze All")
+                with gr.Column(scale=2):
+                    batch_output = gr.Textbox(label="Combined Results")
+
+            with gr.Row():
+                with gr.Column(scale=1):
+                    comparison = gr.DataFrame(label="Comparison")
+
+            with gr.Row():
+                with gr.Column(scale=1):
+                    combined_groups = gr.DataFrame(label="All Reports per Symbol and Volume")
+
+            batch_analyze_btn.click(analyze_batch_files, inputs=[batch_files_input],
+                                    outputs=[batch_output, comparison, combined_groups])
     server_name = "0.0.0.0"
     server_port = 7860
+    # Queued, so the generator handlers can stream the chart after the text
+    demo.queue()
     demo.launch(server_name=server_name, server_port=server_port)
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+"""Parsing and analysis of MT5 HTML reports, shared by the Gradio and Streamlit front-ends."""
+from .analysis import ReportAnalysis, analyze_html, analyze_report
+from .analytics import DealAnalysis, analyze_deals, deals_frame
+from .parser import DEALS, ORDERS, RESULTS, Report, ReportParser, ReportRow, detect_encoding, parse_report
@@ -0,0 +1,43 @@
+"""Parse and analyze a report in one call; the entry point every front-end uses.
+
+The front-ends only render a ReportAnalysis (Gradio textbox and tables,
+Streamlit markdown and dataframes); parsing, statistics and caching all
+happen here, so a change lands in every UI at once.
+"""
+from .analytics import analyze_deals
+from .cache import report_cache
+from .parser import parse_report
+
+
+class ReportAnalysis:
+    """A parsed report and, when it has a Results section, the analysis of its deals."""
+
+    def __init__(self, report, deals=None):
+        self.report = report
+        self.deals = deals
+
+    @property
+    def title(self):
+        return self.report.title
+
+    def to_text(self, newline="\n"):
+        """Title and deal statistics as text; e.g. newline="  \\n" for Markdown line breaks."""
+        text = f"**Title:** {self.title}{newline}{newline}"
+        if self.deals is not None:
+            text += self.deals.to_text(newline)
+        return text
+
+
+def analyze_report(source):
+    """Parse `source` (path, bytes or file-like) and analyze its deals into a ReportAnalysis."""
+    report = parse_report(source)
+    # Only tester / history reports with a Results section carry a deals table worth analyzing
+    deals = analyze_deals(report.deals) if report.results else None
+    return ReportAnalysis(report, deals)
+
+
+def analyze_html(source, cache=report_cache):
+    """analyze_report, served from the content-hash cache when the same report was analyzed before."""
+    if cache is None:
+        return analyze_report(source)
+    return cache.get_or_compute(source, analyze_report, namespace="report")
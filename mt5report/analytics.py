@@ -0,0 +1,187 @@
+"""Vectorized statistics over the Deals table of an MT5 report.
+
+Closed trades are the deals with Direction "out"; their Profit is the trade
+result. Every metric is computed for the whole history and per
+(Symbol, Volume) group in one pass of array operations: groups are integer
+codes and per-group sums, running drawdowns and loss streaks come from
+bincount / cumulative operations instead of a Python loop over groups.
+
+Sharpe and Sortino ratios are per trade (mean trade profit over its standard
+deviation / downside deviation), not annualized.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns of the per-group table, in display order
+GROUP_COLUMNS = ["Symbol", "Volume", "Trades", "Wins", "Win Rate", "Profit", "Expected Value", "Profit Factor",
+                 "Average Win", "Average Loss", "Max Drawdown", "Sharpe", "Sortino", "Max Consecutive Losses"]
+
+_LABELS = [
+    ("Trades", "Trades", "{:d}"),
+    ("Wins", "Wins", "{:d}"),
+    ("Win Rate", "Win Rate", "{:.2%}"),
+    ("Profit", "Profit", "{:.2f}"),
+    ("Expected Value", "Expected Value of Profit", "{:.2f}"),
+    ("Profit Factor", "Profit Factor", "{:.2f}"),
+    ("Average Win", "Average Win", "{:.2f}"),
+    ("Average Loss", "Average Loss", "{:.2f}"),
+    ("Max Drawdown", "Max Drawdown", "{:.2f}"),
+    ("Sharpe", "Sharpe (per trade)", "{:.3f}"),
+    ("Sortino", "Sortino (per trade)", "{:.3f}"),
+    ("Max Consecutive Losses", "Max Consecutive Losses", "{:d}"),
+]
+
+
+class DealAnalysis:
+    """Result of analyze_deals: the deals frame, overall figures and per symbol/volume metrics."""
+
+    def __init__(self, deals, summary, groups):
+        self.deals = deals
+        self.summary = summary
+        self.groups = groups
+
+    def to_text(self, newline="\n"):
+        """The plain-text report the UIs show."""
+        s = self.summary
+        lines = [
+            f"Total Trades: {s['Trades']}",
+            f"Total Wins: {s['Wins']}",
+            f"Win Rate: {s['Win Rate']:.2%}",
+            f"Total Volume: {s['Total Volume']:.2f}",
+            f"Win Volume: {s['Win Volume']:.2f}",
+            f"Total Profit: {s['Profit']:.2f}",
+        ]
+        lines += [f"{label}: {fmt.format(s[key])}" for key, label, fmt in _LABELS[5:]]
+        lines += ["", "Win Rate per Volume Size per Symbol:"]
+        for group in self.groups.to_dict("records"):
+            lines.append(f"Symbol: {group['Symbol']}, Volume: {group['Volume']}")
+            lines += [f"  - {label}: {fmt.format(group[key])}" for key, label, fmt in _LABELS]
+            lines.append("")
+        return newline.join(lines) + newline
+
+
+def deals_frame(rows):
+    """Deals table rows (header first, as parsed) -> DataFrame with numeric Volume and Profit.
+
+    Balance operations are dropped. Empty cells are not kept by the parser, so
+    rows shorter than the header are missing their trailing Comment and are
+    padded rather than rejected.
+    """
+    if not rows:
+        return pd.DataFrame(columns=["Symbol", "Direction", "Volume", "Profit"])
+    header = rows[0]
+    trades = [row for row in rows[1:] if len(row) > 2 and row[2] != 'balance']
+    # pandas pads ragged rows with None; reindex fits them to the header width
+    df = pd.DataFrame(trades).reindex(columns=range(len(header)))
+    df.columns = header
+    df['Volume'] = _to_number(df['Volume'])
+    df['Profit'] = _to_number(df['Profit'])
+    return df
+
+
+def _to_number(column):
+    """Numeric column from MT5 number strings, which use a space as thousands separator."""
+    strings = column.to_numpy(dtype=object)
+    try:
+        # One pass over the whole column; almost every report takes this path
+        numbers = np.array([text.replace(' ', '') for text in strings], dtype=np.float64)
+    except (AttributeError, TypeError, ValueError):
+        # Missing or malformed cells: let pandas turn them into NaN
+        numbers = pd.to_numeric(column.str.replace(' ', '', regex=False), errors='coerce').to_numpy(dtype=np.float64)
+    return pd.Series(numbers, index=column.index, name=column.name)
+
+
+def _metrics(codes, n_groups, profit):
+    """Per-group metrics of trade profits in deal order; codes are group numbers 0..n_groups-1."""
+    win = profit > 0
+    loss = ~win
+    trades = np.bincount(codes, minlength=n_groups)
+    wins = np.bincount(codes, weights=win, minlength=n_groups).astype(np.int64)
+    losses = trades - wins
+    total = np.bincount(codes, weights=profit, minlength=n_groups)
+    gross_win = np.bincount(codes, weights=np.where(win, profit, 0.0), minlength=n_groups)
+    gross_loss = -np.bincount(codes, weights=np.where(loss, profit, 0.0), minlength=n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, wins / trades, 0.0)
+        average_win = gross_win / wins
+        average_loss = gross_loss / losses
+        # Same definition as before: a group without wins (or losses) has no expected value
+        expected = win_rate * average_win - (1 - win_rate) * average_loss
+        profit_factor = np.where(gross_loss > 0, gross_win / gross_loss, np.where(gross_win > 0, np.inf, np.nan))
+
+        mean = total / trades
+        square = np.bincount(codes, weights=profit * profit, minlength=n_groups)
+        variance = (square - trades * mean * mean) / (trades - 1)
+        sharpe = mean / np.sqrt(np.maximum(variance, 0))
+        downside = np.bincount(codes, weights=np.minimum(profit, 0.0) ** 2, minlength=n_groups)
+        sortino = mean / np.sqrt(downside / trades)
+
+    # Stable sort by group keeps deal order inside each group
+    order = np.argsort(codes, kind="stable")
+    g = codes[order]
+    p = profit[order]
+    boundary = np.diff(g, prepend=-1) != 0
+    starts = np.flatnonzero(boundary)
+
+    # Drawdown of each group's running profit, measured from a peak of at least 0
+    equity = np.cumsum(p)
+    group_start_equity = np.repeat(equity[starts] - p[starts], np.diff(np.r_[starts, len(p)]))
+    equity -= group_start_equity
+    peak = _group_cummax(np.maximum(equity, 0.0), starts)
+    max_drawdown = np.zeros(n_groups)
+    if len(p):
+        np.maximum.at(max_drawdown, g, peak - equity)
+
+    # Longest run of consecutive losing trades per group
+    lost = loss[order]
+    lost_before = np.zeros_like(lost)
+    lost_before[1:] = lost[:-1]
+    run_start = lost & (boundary | ~lost_before)
+    run_id = np.cumsum(run_start) - 1
+    run_lengths = np.bincount(run_id[lost], minlength=int(run_start.sum()))
+    max_losses = np.zeros(n_groups, dtype=np.int64)
+    if len(run_lengths):
+        np.maximum.at(max_losses, g[run_start], run_lengths)
+
+    return {
+        "Trades": trades, "Wins": wins, "Win Rate": win_rate, "Profit": total, "Expected Value": expected,
+        "Profit Factor": profit_factor, "Average Win": average_win, "Average Loss": average_loss,
+        "Max Drawdown": max_drawdown, "Sharpe": sharpe, "Sortino": sortino, "Max Consecutive Losses": max_losses,
+    }
+
+
+def _group_cummax(values, starts):
+    """Running maximum that restarts at every group start."""
+    if not len(values):
+        return values
+    # Offset each group so maxima cannot leak across groups, then undo the offset
+    span = values.max() - values.min() + 1.0
+    offset = np.zeros(len(values))
+    offset[starts] = span
+    offset = np.cumsum(offset)
+    return np.maximum.accumulate(values + offset) - offset
+
+
+def analyze_deals(deals):
+    """Analyze the parsed Deals rows (or a frame from deals_frame) into a DealAnalysis."""
+    df = deals if isinstance(deals, pd.DataFrame) else deals_frame(deals)
+    out = df[df['Direction'] == 'out']
+    profit = out['Profit'].to_numpy(dtype=float)
+    profit = np.where(np.isnan(profit), 0.0, profit)
+
+    # Factorize each key on its own and combine the integer codes; far cheaper than hashing tuples
+    symbol_codes, symbols = pd.factorize(out['Symbol'], sort=True)
+    volume_codes, volumes = pd.factorize(out['Volume'], sort=True)
+    # Trades without a symbol or volume are left out of the groups, as groupby does
+    keyed = (symbol_codes >= 0) & (volume_codes >= 0)
+    pair_codes = symbol_codes[keyed].astype(np.int64) * len(volumes) + volume_codes[keyed]
+    pairs, codes = np.unique(pair_codes, return_inverse=True)
+    groups = pd.DataFrame(_metrics(codes.ravel(), len(pairs), profit[keyed]))
+    groups.insert(0, "Symbol", np.asarray(symbols)[pairs // len(volumes)])
+    groups.insert(1, "Volume", np.asarray(volumes)[pairs % len(volumes)])
+
+    overall = {k: v[0] for k, v in _metrics(np.zeros(len(profit), dtype=np.int64), 1, profit).items()}
+    overall["Total Volume"] = float(df['Volume'].sum())
+    overall["Win Volume"] = float(out['Volume'][profit > 0].sum())
+    return DealAnalysis(df, overall, groups[GROUP_COLUMNS])
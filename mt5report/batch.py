@@ -0,0 +1,198 @@
+"""Analyze many reports at once, parsing them in parallel worker processes.
+
+Reports can be given as files, folders (every .htm / .html inside) and .zip
+archives, or as (name, bytes) pairs for uploads. Archives are extracted to a
+temporary folder and workers are handed the file paths. Each worker parses and
+analyzes one report at a time and sends back only the summary figures and
+the deal columns the combined statistics need, never the full parsed report,
+so little data crosses process boundaries. The largest reports are submitted
+first, which keeps all cores busy until the end instead of leaving one big
+report running alone.
+
+Workers read and write the same on-disk cache as the UIs (by content hash),
+so re-running a batch, or opening one of its reports in a UI afterwards, does
+not parse it again.
+
+    python -m mt5report.batch optimizations/ more_reports.zip --workers 8 --out comparison.csv
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .analysis import analyze_html
+from .analytics import analyze_deals
+from .cache import ReportCache
+
+REPORT_EXTENSIONS = (".htm", ".html")
+# Summary figures of each report, in comparison table order
+COMPARISON_COLUMNS = ["Trades", "Wins", "Win Rate", "Profit", "Expected Value", "Profit Factor", "Average Win",
+                      "Average Loss", "Max Drawdown", "Sharpe", "Sortino", "Max Consecutive Losses", "Total Volume"]
+DEAL_COLUMNS = ["Symbol", "Direction", "Volume", "Profit"]
+
+_worker_cache = None
+
+
+class ReportSummary:
+    """What a worker returns for one report; `error` is set instead of the figures when it failed."""
+
+    def __init__(self, name, title=None, summary=None, deals=None, seconds=0.0, error=None):
+        self.name = name
+        self.title = title
+        self.summary = summary
+        self.deals = deals
+        self.seconds = seconds
+        self.error = error
+
+
+class BatchAnalysis:
+    """Per-report summaries, their side-by-side table and statistics over all reports' trades together."""
+
+    def __init__(self, reports, combined, seconds):
+        self.reports = reports
+        self.combined = combined
+        self.seconds = seconds
+
+    @property
+    def table(self):
+        rows = []
+        for report in self.reports:
+            row = {"Report": report.name, "Title": report.title}
+            if report.summary is not None:
+                row.update((column, report.summary[column]) for column in COMPARISON_COLUMNS)
+            row.update({"Seconds": round(report.seconds, 3), "Error": report.error})
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["Report", "Title"] + COMPARISON_COLUMNS + ["Seconds", "Error"])
+
+    def to_text(self, newline="\n"):
+        analyzed = sum(r.error is None for r in self.reports)
+        text = (f"{len(self.reports)} reports, {analyzed} analyzed, in {self.seconds:.2f} s "
+                f"({sum(r.seconds for r in self.reports):.2f} s of report time){newline}{newline}")
+        if self.combined is not None:
+            text += f"All reports combined:{newline}" + self.combined.to_text(newline)
+        return text
+
+
+def collect_reports(items, extract_dir):
+    """(name, path or bytes) for every report in the given paths, folders, zip files and (name, bytes) pairs.
+
+    Reports inside zip files are extracted under `extract_dir`, which the caller removes when done.
+    """
+    reports = []
+    for item in items:
+        if isinstance(item, tuple):
+            name, data = item
+            if name.lower().endswith(".zip"):
+                reports += _zip_reports(io.BytesIO(data), name, extract_dir)
+            else:
+                reports.append((name, data))
+        elif os.path.isdir(item):
+            for folder, _, files in os.walk(item):
+                reports += [(os.path.relpath(os.path.join(folder, f), item), os.path.join(folder, f))
+                            for f in sorted(files) if f.lower().endswith(REPORT_EXTENSIONS)]
+        elif str(item).lower().endswith(".zip"):
+            reports += _zip_reports(item, os.path.basename(item), extract_dir)
+        else:
+            reports.append((os.path.basename(item), item))
+    return reports
+
+
+def _zip_reports(source, name, extract_dir):
+    # One folder per archive, so equal member names in two archives do not collide
+    folder = tempfile.mkdtemp(dir=extract_dir)
+    with zipfile.ZipFile(source) as archive:
+        # extract() strips absolute paths and ".." from member names
+        return [(f"{name}/{member}", archive.extract(member, folder)) for member in archive.namelist()
+                if member.lower().endswith(REPORT_EXTENSIONS) and not member.startswith("__MACOSX/")]
+
+
+def _size(payload):
+    return len(payload) if isinstance(payload, (bytes, bytearray)) else os.path.getsize(payload)
+
+
+def analyze_one(name, payload, use_cache=True):
+    """Parse and analyze one report into a ReportSummary; exceptions are reported, not raised."""
+    global _worker_cache
+    start = time.perf_counter()
+    if use_cache and _worker_cache is None:
+        # Disk only: a worker's in-memory LRU would just hold full reports nobody asks for again
+        _worker_cache = ReportCache(memory_items=0)
+    try:
+        analysis = analyze_html(payload, cache=_worker_cache if use_cache else None)
+    except Exception as e:
+        return ReportSummary(name, seconds=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+    if analysis.deals is None:
+        return ReportSummary(name, analysis.title, seconds=time.perf_counter() - start,
+                             error="no Results section")
+    deals = analysis.deals
+    return ReportSummary(name, analysis.title, deals.summary, deals.deals[DEAL_COLUMNS],
+                         time.perf_counter() - start)
+
+
+def analyze_batch(items, workers=None, use_cache=True, on_result=None):
+    """Analyze every report found in `items` (see collect_reports) across `workers` processes."""
+    start = time.perf_counter()
+    extract_dir = tempfile.mkdtemp(prefix="mt5report-batch-")
+    try:
+        results = _analyze_reports(collect_reports(items, extract_dir), workers, use_cache, on_result)
+    finally:
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+    frames = [r.deals for r in results if r.deals is not None]
+    combined = analyze_deals(pd.concat(frames, ignore_index=True)) if frames else None
+    for result in results:
+        # The trades were only needed for the combined statistics
+        result.deals = None
+    return BatchAnalysis(results, combined, time.perf_counter() - start)
+
+
+def _analyze_reports(reports, workers, use_cache, on_result):
+    # Largest first, so the longest parses are not the ones left running at the end
+    order = sorted(range(len(reports)), key=lambda i: _size(reports[i][1]), reverse=True)
+    workers = min(workers or os.cpu_count(), len(reports)) or 1
+    results = [None] * len(reports)
+
+    if workers == 1:
+        for i in order:
+            results[i] = analyze_one(*reports[i], use_cache)
+            if on_result:
+                on_result(results[i])
+    else:
+        # Spawn, not fork: this runs inside the threaded Gradio / Streamlit servers (as render.py does)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(analyze_one, *reports[i], use_cache): i for i in order}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(results[futures[future]])
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze many MT5 reports in parallel and compare them.")
+    parser.add_argument("paths", nargs="+", help="report files, folders of reports or .zip archives")
+    parser.add_argument("--workers", type=int, default=None, help="parallel processes (default: one per core)")
+    parser.add_argument("--no-cache", action="store_true", help="always parse, ignoring the analysis cache")
+    parser.add_argument("--out", default=None, help="write the comparison table to this CSV file")
+    args = parser.parse_args()
+
+    def report(result):
+        status = result.error or f"{result.summary['Trades']} trades, profit {result.summary['Profit']:.2f}"
+        print(f"{result.name}: {status} ({result.seconds:.2f} s)")
+
+    batch = analyze_batch(args.paths, args.workers, not args.no_cache, on_result=report)
+    print()
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(batch.table.drop(columns=["Title"]).to_string(index=False))
+    print()
+    print(batch.to_text())
+    if args.out:
+        batch.table.to_csv(args.out, index=False)
+        print(f"Comparison table written to {args.out}")
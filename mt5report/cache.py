@@ -0,0 +1,135 @@
+"""Two-tier cache of report analysis results, keyed by report content.
+
+Keys combine the sha256 of the uploaded report, a namespace naming what was
+computed from it (analysis.analyze_html uses "report") and
+ANALYZER_VERSION, so a change to the parser or analytics never serves stale
+results. Results are kept in an in-memory LRU and pickled to a directory on
+disk; the directory is trimmed to `max_bytes`, least recently used first.
+
+The default cache lives in ~/.cache/mt5report (override with
+MT5REPORT_CACHE_DIR, size with MT5REPORT_CACHE_MB).
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+# Bump whenever parsing or analysis output changes
+ANALYZER_VERSION = "2"
+
+CACHE_DIR = os.environ.get("MT5REPORT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mt5report"))
+CACHE_MB = float(os.environ.get("MT5REPORT_CACHE_MB", 512))
+HASH_CHUNK = 1 << 20
+
+_MISSING = object()
+
+
+def content_hash(source):
+    """sha256 of a report given as a path, bytes or file-like object (its position is restored)."""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, (str, os.PathLike)) or not hasattr(source, "read"):
+        with open(source if isinstance(source, (str, os.PathLike)) else source.name, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(block)
+    else:
+        start = source.tell()
+        for block in iter(lambda: source.read(HASH_CHUNK), b""):
+            digest.update(block)
+        source.seek(start)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """In-memory LRU in front of a size-bounded on-disk store."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MB * 2**20, memory_items=32):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, digest, namespace):
+        return f"{namespace}-v{ANALYZER_VERSION}-{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return default
+        # Mark as recently used for eviction
+        os.utime(path)
+        self.hits["disk"] += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError as e:
+            print(f"mt5report: could not write analysis cache in {self.directory}: {e}")
+
+    def get_or_compute(self, source, compute, namespace="analysis"):
+        """Cached `compute(source)`, keyed by the content of `source`."""
+        key = self.key(content_hash(source), namespace)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            value = compute(source)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for entry in self._entries():
+            os.remove(entry.path)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith(".pkl")]
+        except OSError:
+            return []
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+report_cache = ReportCache()
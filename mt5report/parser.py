@@ -0,0 +1,202 @@
+"""Streaming parser for MT5 strategy tester / trade history HTML reports.
+
+The report is decoded one chunk at a time and only the markup that matters is
+looked at: tables, rows and their cells, matched with regular expressions
+rather than a general HTML tokenizer. Rows are emitted as each chunk is
+scanned. No DOM is built, so memory stays bounded by the chunk size,
+whatever the size of the report.
+
+Only three sections are extracted, following the layout MT5 writes:
+
+  * Results: label/value pairs after the "Results" row of the first table,
+  * Orders and Deals: rows after the "Orders" / "Deals" rows of later tables,
+    the first row of each being the column header.
+
+MT5 saves reports as UTF-16 with a byte order mark, so the encoding is taken
+from the BOM; chardet is only consulted, on a prefix of the file, when there
+is none.
+"""
+import codecs
+import html
+import io
+import os
+import re
+from typing import NamedTuple
+
+RESULTS, ORDERS, DEALS = "results", "orders", "deals"
+
+CHUNK_SIZE = 1 << 20
+DETECT_SIZE = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Top-level markup: the title, table starts and whole rows. A row's content runs
+# up to </tr>, or to the next row / table boundary when MT5 leaves it open; the
+# [^<]* runs keep the scan in the regex engine instead of one step per character.
+_BLOCKS = re.compile(r"<title[^>]*>(.*?)</title\s*>|<(table)\b[^>]*>"
+                     r"|<tr\b[^>]*>([^<]*(?:<(?!/?tr\b|/?table\b)[^<]*)*)(?:</tr\s*>)?", re.S | re.I)
+_CELLS = re.compile(r"<t[dh]\b[^>]*>([^<]*(?:<(?!/?t[dh]\b)[^<]*)*)", re.I)
+_TAG = re.compile(r"<[^>]*>")
+
+
+def cell_text(inner):
+    """Cell text like BeautifulSoup's get_text(strip=True): each text piece stripped, then joined."""
+    text = "".join(piece.strip() for piece in _TAG.split(inner)) if "<" in inner else inner.strip()
+    return html.unescape(text) if "&" in text else text
+
+
+class ReportRow(NamedTuple):
+    """One row of a report section; `cells` are the non-empty cell texts."""
+    section: str
+    cells: list
+    header: bool = False
+
+
+class Report:
+    """All rows of a parsed report, in the list-of-lists shape the UIs display.
+
+    `orders` and `deals` start with their column header row.
+    """
+
+    def __init__(self, title, results, orders, deals):
+        self.title = title
+        self.results = results
+        self.orders = orders
+        self.deals = deals
+
+
+def detect_encoding(prefix):
+    """Encoding from a byte order mark, else chardet's guess on `prefix`."""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        import chardet
+    except ImportError:
+        return "utf-8"
+    return chardet.detect(prefix)["encoding"] or "utf-8"
+
+
+def _open_binary(source):
+    """(binary file object, should_close) for a path, bytes or file-like object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if hasattr(source, "read"):
+        return source, False
+    # e.g. Gradio file wrappers exposing only a temp file path
+    return open(source.name, "rb"), True
+
+
+class _RowParser:
+    """Collects ReportRows into `self.rows` as decoded text is fed through it."""
+
+    def __init__(self):
+        self.rows = []
+        self.title = None
+        self._pending = ""
+        self._tables = 0
+        self._in_results = False
+        self._section = None
+        self._header_next = False
+
+    def feed(self, text, final=False):
+        buf = self._pending + text
+        if final:
+            # Close a trailing row that has no </tr>
+            buf += "</table>"
+            end = len(buf)
+        else:
+            # Everything before the last row / table start is complete
+            lower = buf.lower()
+            end = max(lower.rfind("<tr"), lower.rfind("<table"), 0)
+        self._pending = buf[end:]
+
+        for match in _BLOCKS.finditer(buf):
+            if match.start() >= end:
+                break
+            row = match.group(3)
+            if row is not None:
+                cells = [inner.strip() if "<" not in inner and "&" not in inner else cell_text(inner)
+                         for inner in _CELLS.findall(row)]
+                self._add_row([c for c in cells if c])
+            elif match.group(2):
+                self._tables += 1
+                self._in_results = False
+                self._section = None
+            elif self.title is None:
+                self.title = cell_text(match.group(1))
+
+    def close(self):
+        self.feed("", final=True)
+
+    def _add_row(self, columns):
+        if not columns:
+            return
+        if self._tables == 1:
+            if self._in_results:
+                for i in range(0, len(columns) - 1, 2):
+                    self.rows.append(ReportRow(RESULTS, columns[i:i + 2]))
+            elif columns[0] == "Results":
+                self._in_results = True
+        elif columns[0] == "Orders":
+            self._section, self._header_next = ORDERS, True
+        elif columns[0] == "Deals":
+            self._section, self._header_next = DEALS, True
+        elif self._section is not None:
+            self.rows.append(ReportRow(self._section, columns, self._header_next))
+            self._header_next = False
+
+
+class ReportParser:
+    """Incrementally parse a report; iterate `rows()` to receive ReportRows as they are read.
+
+    `source` is a path, bytes, or a binary file-like object (e.g. a Streamlit upload).
+    """
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.encoding = None
+        self.bytes_read = 0
+        self._parser = _RowParser()
+
+    @property
+    def title(self):
+        return self._parser.title
+
+    def rows(self):
+        f, should_close = _open_binary(self.source)
+        try:
+            prefix = f.read(DETECT_SIZE)
+            self.encoding = detect_encoding(prefix)
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            parser = self._parser
+            chunk = prefix
+            while chunk:
+                self.bytes_read += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                yield from parser.rows
+                parser.rows.clear()
+                chunk = f.read(self.chunk_size)
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+            yield from parser.rows
+            parser.rows.clear()
+        finally:
+            if should_close:
+                f.close()
+
+
+def parse_report(source, chunk_size=CHUNK_SIZE):
+    """Read a whole report into a Report (results pairs, orders and deals rows)."""
+    parser = ReportParser(source, chunk_size)
+    sections = {RESULTS: [], ORDERS: [], DEALS: []}
+    for row in parser.rows():
+        sections[row.section].append(row.cells)
+    return Report(parser.title or "No title found", sections[RESULTS], sections[ORDERS], sections[DEALS])
@@ -0,0 +1,96 @@
+"""Chart rendering for the report analyzers, off the request thread and cached.
+
+Charts are drawn on plain matplotlib Figures with an Agg canvas, never through
+pyplot: pyplot keeps every figure it creates in a global registry until it is
+explicitly closed, which is how a long-running server leaks memory one
+analysis at a time. A Figure made here is referenced only by the render call
+and is freed as soon as its PNG bytes are written.
+
+Rendering runs in a small pool of worker processes (RENDER_WORKERS, default
+2), so a request can return its text while the chart is still being drawn,
+and drawing never competes with the server for the GIL. Rendered PNGs are
+stored in the report cache under the report's content hash, next to its
+analysis, so a report seen before gets its chart without rendering.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .cache import content_hash, report_cache
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", 2))
+# Part of the cache key; bump when the chart's look changes
+CHART_VERSION = "1"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_win_rate(groups, width=10, height=6, dpi=100):
+    """PNG of win rate and expected value against volume, per symbol, from DealAnalysis.groups."""
+    fig = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax1 = fig.add_subplot()
+    by_symbol = list(groups.groupby('Symbol'))
+
+    for symbol, group in by_symbol:
+        ax1.scatter(group['Volume'], group['Win Rate'], label=f'Win Rate {symbol}')
+    ax1.set_xlabel('Volume')
+    ax1.set_ylabel('Win Rate', color='b')
+    ax1.tick_params(axis='y', labelcolor='b')
+    ax1.set_title('Win Rate & Expected Value vs Volume per Symbol')
+    ax1.legend(loc='upper left')
+
+    # Expected value on a second y-axis
+    ax2 = ax1.twinx()
+    for symbol, group in by_symbol:
+        ax2.scatter(group['Volume'], group['Expected Value'], color='r', marker='x', label=f'Expected Value {symbol}')
+    ax2.set_ylabel('Expected Value', color='r')
+    ax2.tick_params(axis='y', labelcolor='r')
+    ax2.legend(loc='upper right')
+
+    png = io.BytesIO()
+    fig.savefig(png, format='png')
+    return png.getvalue()
+
+
+def render_pool():
+    """The shared render process pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: workers start clean instead of forking a copy of the whole server
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def win_rate_chart(source, groups, cache=report_cache):
+    """Future of the win-rate PNG for the report `source`, from the cache or rendered in the pool."""
+    key = cache.key(content_hash(source), f"win-rate-chart-v{CHART_VERSION}") if cache is not None else None
+    png = cache.get(key) if key is not None else None
+    if png is not None:
+        done = Future()
+        done.set_result(png)
+        return done
+
+    future = render_pool().submit(render_win_rate, groups)
+    if key is not None:
+        def store(done):
+            if done.exception() is None:
+                cache.put(key, done.result())
+        future.add_done_callback(store)
+    return future
+
+
+def shutdown():
+    """Stop the render workers (e.g. at server exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None